@@ -2,4 +2,4 @@
 ASR subpackage
 Handles speech-to-text functionality.
 """
-from .asr_engine import transcribe_audio
+from .asr_engine import transcribe_audio, transcribe_blob, transcribe_bytes
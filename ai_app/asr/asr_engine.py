@@ -1,9 +1,15 @@
 import whisper
+import io
 import os
 import tempfile
+import numpy as np
 from pydub import AudioSegment
 from datetime import datetime
 
+from ai_app.core.lru import LRUMemo
+from ai_app.utils.blob_store import read_blob
+from ai_app.utils.audio_archive import split_wav
+
 # ================================
 # LOAD MODEL (ONCE)
 # ================================
@@ -31,6 +37,30 @@ def _convert_to_wav(audio_path: str) -> str:
     return tmp_wav.name
 
 
+WHISPER_SAMPLE_RATE = 16000
+_WHISPER_PCM = {"channels": 1, "frame_rate": WHISPER_SAMPLE_RATE, "sample_width": 2}
+
+
+def _decode_to_samples(data) -> np.ndarray:
+    """
+    Float32 mono 16 kHz samples from in-memory audio (bytes or
+    memoryview); no temp files. WAVs already in Whisper's format are
+    read straight from the buffer.
+    """
+    parts = split_wav(data)
+    if parts is not None:
+        _, pcm, _, params = parts
+        if params == _WHISPER_PCM:
+            pcm = pcm[:len(pcm) - len(pcm) % 2]
+            return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+        audio = AudioSegment(data=bytes(pcm), **params)
+    else:
+        audio = AudioSegment.from_file(io.BytesIO(data))
+
+    audio = audio.set_channels(1).set_frame_rate(WHISPER_SAMPLE_RATE).set_sample_width(2)
+    return np.frombuffer(audio.raw_data, dtype="<i2").astype(np.float32) / 32768.0
+
+
 # ================================
 # SAVE TRANSCRIPT
 # ================================
@@ -61,35 +91,69 @@ def transcribe_audio(audio_path: str, language: str | None = None) -> dict:
     wav_path = _convert_to_wav(audio_path)
 
     try:
-        options = {
-            "task": "transcribe",
-            "fp16": False,
-            "verbose": False
-        }
+        return _transcribe(wav_path, language, label=audio_path)
+    finally:
+        if os.path.exists(wav_path):
+            os.remove(wav_path)
 
-        if language:
-            options["language"] = language
 
-        result = model.transcribe(wav_path, **options)
+def transcribe_bytes(data, language: str | None = None, label: str = "memory") -> dict:
+    """
+    Transcribe in-memory audio (bytes / memoryview, e.g. a packed
+    segment view) without writing temp files. `label` names the
+    saved transcript.
+    """
+    return _transcribe(_decode_to_samples(data), language, label=label)
 
-        text = result["text"].strip()
-        detected_language = result["language"]
 
-        transcript_path = _save_transcript(
-            text=text,
-            language=detected_language,
-            audio_path=audio_path
-        )
+def _transcribe(audio, language, label) -> dict:
+    """Run Whisper on a file path or float32 sample array."""
+    options = {
+        "task": "transcribe",
+        "fp16": False,
+        "verbose": False
+    }
 
-        return {
-            "text": text,
-            "language": detected_language,
-            "transcript_path": transcript_path
-        }
+    if language:
+        options["language"] = language
 
-    finally:
-        if os.path.exists(wav_path):
-            os.remove(wav_path)
+    result = model.transcribe(audio, **options)
+
+    text = result["text"].strip()
+    detected_language = result["language"]
+
+    transcript_path = _save_transcript(
+        text=text,
+        language=detected_language,
+        audio_path=label
+    )
+
+    return {
+        "text": text,
+        "language": detected_language,
+        "transcript_path": transcript_path
+    }
+
+
+# ================================
+# CONTENT-ADDRESSED AUDIO
+# ================================
+TRANSCRIPT_CACHE_SIZE = 2048
+
+# (blob hash, language, model) -> ASR output: identical uploads are
+# transcribed once
+transcript_memo = LRUMemo(TRANSCRIPT_CACHE_SIZE)
+
+
+def transcribe_blob(digest: str, language: str | None = None) -> dict:
+    """
+    Transcribe audio stored in the blob store (see ai_app.utils.blob_store),
+    decoded in memory; archived blobs are restored on demand.
+    """
+    return transcript_memo.get_or_compute(
+        (digest, language, MODEL_SIZE),
+        lambda: transcribe_bytes(read_blob(digest), language, label=digest)
+    )
 
 
 # ================================
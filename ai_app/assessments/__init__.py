@@ -1 +1,13 @@
-from .assess import assess_speech
+"""
+Assessments subpackage
+Question catalog, speech assessment and re-grading.
+"""
+
+
+def __getattr__(name):
+    # Imported lazily: assess pulls in the Whisper model, which
+    # catalog / re-grade users (and their worker processes) never need.
+    if name == "assess_speech":
+        from .assess import assess_speech
+        return assess_speech
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,7 @@
 from ai_app.asr import transcribe_audio
-from ai_app.core.scoring import score_text
-from ai_app.rag import generate_explanation
+from ai_app.core.scoring import combine_scores, SCORER_VERSION, SCORER_BLEND
+from ai_app.core.artifacts import get_artifacts
+from ai_app.core.memo import memoized_score_text, memoized_explanation
 from ai_app.assessments.assessment_store import get_question
 
 
@@ -10,28 +11,30 @@ def assess_speech(test_id, question_id, audio_path):
 
     expected_text = question["expected_text"]
     expected_phonemes = question.get("expected_phonemes")
+    compiled = get_artifacts(question)
 
     # 2️⃣ ASR
     asr_out = transcribe_audio(audio_path)
     spoken_text = asr_out["text"]
 
     # 3️⃣ Scoring (WORD + PHONEME)
-    score_result = score_text(
+    score_result = memoized_score_text(
+        question_id=question_id,
         expected_text=expected_text,
         actual_text=spoken_text,
-        expected_phonemes=expected_phonemes
+        expected_phonemes=expected_phonemes,
+        compiled=compiled
     )
 
     word_score = score_result["word_score"]
     phoneme_score = score_result["phoneme_score"]
 
     # 4️⃣ FINAL COMBINED SCORE (🔥 FIX FOR RAG)
-    final_score = round(
-        0.6 * word_score + 0.4 * phoneme_score, 2
-    )
+    final_score = combine_scores(word_score, phoneme_score)
 
     # 5️⃣ Explanation (XAI + RAG)
-    explanation = generate_explanation(
+    explanation = memoized_explanation(
+        question_id=question_id,
         expected_text=expected_text,
         spoken_text=spoken_text,
         word_score=word_score,
@@ -62,5 +65,7 @@ def assess_speech(test_id, question_id, audio_path):
             "phonemes": score_result["phoneme_analysis"]
         },
 
-        "explanation": explanation
+        "explanation": explanation,
+        "scorer": SCORER_BLEND,
+        "scorer_version": SCORER_VERSION
     }
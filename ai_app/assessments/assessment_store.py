@@ -1,20 +1,17 @@
-import json
-import os
+"""
+Question lookups for scoring and re-grading.
+Thin wrappers over the unified catalog (catalog.py): built-in and
+teacher-authored tests alike, indexed, cached and read-only.
+"""
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-FILE_PATH = os.path.join(BASE_DIR, "assessments.json")
+from ai_app.assessments.catalog import (
+    get_catalog, get_test, get_question, freeze, thaw
+)
 
 
 def load_tests():
-    with open(FILE_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)["tests"]
+    return list(get_catalog().tests)
 
 
 def get_test_by_id(test_id):
-    tests = load_tests()
-    return next(t for t in tests if t["test_id"] == test_id)
-
-
-def get_question(test_id, question_id):
-    test = get_test_by_id(test_id)
-    return next(q for q in test["questions"] if q["question_id"] == question_id)
+    return get_test(test_id)
@@ -0,0 +1,305 @@
+"""
+Unified assessment catalog
+One schema for every assessment, whichever file it lives in:
+- built-in tests:     ai_app/assessments/assessments.json  (tests[] / questions)
+- teacher-authored:   assessments/assessments.json         (assessments[] / words,
+                                                            sentences or an image)
+
+Legacy records are migrated on load into
+
+    {test_id, title, type, language, difficulty, created_by, created_at,
+     source, questions: [{question_id, type, expected_text,
+                          expected_phonemes, compiled, ...}]}
+
+and indexed by id, creator, type and language. Files are stat-checked
+at most once per CHECK_INTERVAL and re-parsed only when they change;
+returned tests / questions are read-only (see freeze / thaw).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+from ai_app.core.artifacts import is_current, compile_question
+from ai_app.core.languages import normalize_language
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILTIN_FILE = os.path.join(BASE_DIR, "assessments.json")
+AUTHORED_FILE = "assessments/assessments.json"
+
+# Later sources win when two define the same test_id
+CATALOG_SOURCES = (
+    ("builtin", BUILTIN_FILE),
+    ("teacher", AUTHORED_FILE)
+)
+
+TYPE_WORD = "word_pronunciation"
+TYPE_IMAGE = "image_description"
+TYPE_FILLBLANK = "fill_blank"
+
+# Minimum seconds between two stat() checks of the catalog files
+CHECK_INTERVAL = 1.0
+
+
+def freeze(obj):
+    """Recursively convert dicts / lists into read-only equivalents."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+def thaw(obj):
+    """Mutable (and JSON-serializable) deep copy of a frozen object."""
+    if isinstance(obj, MappingProxyType):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [thaw(v) for v in obj]
+    return obj
+
+
+# ===============================
+# MIGRATION (ANY RECORD -> TEST)
+# ===============================
+def _word_question(question):
+    # Compile missing / stale artifacts once, here, not per utterance
+    if not is_current(question.get("compiled")):
+        question["compiled"] = compile_question(
+            question.get("expected_text", ""), question.get("expected_phonemes")
+        )
+    return question
+
+
+def _legacy_questions(record, test_id):
+    if "words" in record:
+        return [
+            _word_question({
+                "question_id": f"{test_id}_q{i}",
+                "type": "word",
+                "expected_text": w.get("word", ""),
+                "expected_phonemes": w.get("phonetic") or None,
+                "example": w.get("example", ""),
+                "compiled": w.get("compiled")
+            })
+            for i, w in enumerate(record["words"], start=1)
+        ]
+
+    if "sentences" in record:
+        return [
+            {
+                "question_id": f"{test_id}_q{i}",
+                "type": "fill_blank",
+                "prompt": s.get("text", ""),
+                "expected_text": s.get("blank", "")
+            }
+            for i, s in enumerate(record["sentences"], start=1)
+        ]
+
+    if "prompt" in record or "image_url" in record:
+        return [{
+            "question_id": f"{test_id}_q1",
+            "type": "image",
+            "prompt": record.get("prompt", ""),
+            "image_url": record.get("image_url", ""),
+            "expected_text": ""
+        }]
+
+    return []
+
+
+def migrate_record(record, source):
+    """Normalize a tests[] or legacy assessments[] record to the catalog schema."""
+    test_id = record.get("test_id") or record.get("id")
+
+    if "questions" in record:
+        questions = [
+            _word_question(dict(q)) if q.get("type", "word") == "word" else dict(q)
+            for q in record["questions"]
+        ]
+    else:
+        questions = _legacy_questions(record, test_id)
+
+    return {
+        "test_id": test_id,
+        "title": record.get("title") or record.get("topic") or test_id,
+        "type": record.get("type", TYPE_WORD),
+        "language": normalize_language(record.get("language")),
+        "difficulty": record.get("difficulty"),
+        "created_by": record.get("created_by"),
+        "created_at": record.get("created_at"),
+        "source": source,
+        "questions": questions
+    }
+
+
+def load_catalog_file(path, source="import"):
+    """Every record of one file (either format), migrated; [] if missing."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    records = data.get("tests", []) + data.get("assessments", [])
+    return [migrate_record(r, source) for r in records if r.get("test_id") or r.get("id")]
+
+
+# ===============================
+# CATALOG
+# ===============================
+class AssessmentCatalog:
+    """
+    In-process, indexed view of all catalog sources.
+    Lookups are dict hits; refresh() costs at most one stat() per
+    file per CHECK_INTERVAL.
+    """
+
+    def __init__(self, sources=CATALOG_SOURCES):
+        self.sources = tuple(sources)
+        self.tests = ()
+        self.by_id = {}
+        self.by_question = {}
+        self.by_creator = {}
+        self.by_type = {}
+        self.by_language = {}
+        self.version = 0
+
+        self._stat_signature = None
+        self._content_hash = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        signature = []
+        for _, path in self.sources:
+            try:
+                st = os.stat(path)
+                signature.append((path, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def _load(self):
+        raws = []
+        digest = hashlib.sha1()
+        for source, path in self.sources:
+            raw = b""
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    raw = f.read()
+            raws.append((source, raw))
+            digest.update(path.encode("utf-8"))
+            digest.update(raw)
+
+        content_hash = digest.hexdigest()
+        if content_hash == self._content_hash:
+            return
+
+        merged = {}
+        for source, raw in raws:
+            if not raw.strip():
+                continue
+            try:
+                data = json.loads(raw.decode("utf-8"))
+            except ValueError as e:
+                print(f"[CATALOG] Warning: unreadable catalog source {source} -> {e}")
+                continue
+            for record in data.get("tests", []) + data.get("assessments", []):
+                if record.get("test_id") or record.get("id"):
+                    test = migrate_record(record, source)
+                    merged[test["test_id"]] = test
+
+        tests = tuple(freeze(t) for t in merged.values())
+        by_id, by_question = {}, {}
+        by_creator, by_type, by_language = {}, {}, {}
+
+        for test in tests:
+            by_id[test["test_id"]] = test
+            by_creator.setdefault(test["created_by"], []).append(test)
+            by_type.setdefault(test["type"], []).append(test)
+            by_language.setdefault(test["language"], []).append(test)
+            for q in test["questions"]:
+                by_question[(test["test_id"], q["question_id"])] = q
+
+        # Swap in new objects: readers holding the old ones stay consistent
+        self.by_id = by_id
+        self.by_question = by_question
+        self.by_creator = {k: tuple(v) for k, v in by_creator.items()}
+        self.by_type = {k: tuple(v) for k, v in by_type.items()}
+        self.by_language = {k: tuple(v) for k, v in by_language.items()}
+        self.tests = tests
+        self._content_hash = content_hash
+        self.version += 1
+
+    def refresh(self, force=False):
+        """Reload if any catalog file changed on disk."""
+        now = time.monotonic()
+        if not force and self._stat_signature is not None and now - self._last_check < CHECK_INTERVAL:
+            return self
+
+        with self._lock:
+            self._last_check = now
+            signature = self._stat()
+            if force or signature != self._stat_signature:
+                self._load()
+                self._stat_signature = signature
+
+        return self
+
+    def query(self, creator=None, type=None, language=None):
+        """Tests matching every given filter, in catalog order."""
+        candidates = [
+            index.get(key, ())
+            for index, key in (
+                (self.by_creator, creator),
+                (self.by_type, type),
+                (self.by_language, normalize_language(language) if language else None)
+            )
+            if key is not None
+        ]
+        if not candidates:
+            return list(self.tests)
+
+        # Walk the smallest index bucket, check the others by identity
+        candidates.sort(key=len)
+        others = [set(map(id, c)) for c in candidates[1:]]
+        return [t for t in candidates[0] if all(id(t) in o for o in others)]
+
+
+_catalog = AssessmentCatalog()
+
+
+def get_catalog():
+    return _catalog.refresh()
+
+
+def refresh_catalog():
+    """Reload now, skipping CHECK_INTERVAL (call after writing a source)."""
+    return _catalog.refresh(force=True)
+
+
+# ===============================
+# API
+# ===============================
+def list_tests(creator=None, type=None, language=None):
+    return get_catalog().query(creator, type, language)
+
+
+def get_test(test_id):
+    return get_catalog().by_id[test_id]
+
+
+def get_question(test_id, question_id):
+    return get_catalog().by_question[(test_id, question_id)]
+
+
+# ================================
+# CLI
+# ================================
+if __name__ == "__main__":
+    catalog = get_catalog()
+    for test in catalog.tests:
+        print(f"{test['test_id']:40} {test['source']:8} {test['type']:20} "
+              f"{test['language']:4} {len(test['questions'])} questions")
@@ -0,0 +1,261 @@
+"""
+Incremental re-grading over stored transcripts
+Re-scores only the submissions affected by edited questions or a
+version bump of the scorer that produced them, always with that same
+scorer. ASR is never re-run: the stored transcript is scored again
+against the current catalog. Responses without a scorer_version are
+left alone unless explicitly included. Updated submissions are
+appended to the results log under their submission_id.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from ai_app.core.scoring import (
+    score_text, combine_scores, match_score,
+    SCORER_VERSION, SCORER_BLEND, SCORER_MATCH, MATCH_SCORER_VERSION
+)
+from ai_app.rag.explanation import generate_explanation
+from ai_app.assessments.assessment_store import get_question
+from ai_app.utils.results_store import load_results, update_results
+
+# Below this many responses a process pool costs more than it saves
+MIN_PARALLEL_JOBS = 64
+
+# Current version of every scorer that can be re-run
+SCORER_VERSIONS = {
+    SCORER_BLEND: SCORER_VERSION,
+    SCORER_MATCH: MATCH_SCORER_VERSION
+}
+
+
+# --------------------------------------------------
+# SELECTION
+# --------------------------------------------------
+def _infer_scorer(resp, submission=None):
+    """
+    Scorer of a response stored before scorers were stamped. Those came
+    from the student page (match scorer): they carry word /
+    transcription and no word_score, in word_pronunciation submissions.
+    """
+    if "word_score" in resp:
+        return SCORER_BLEND
+    if (
+        "word" in resp or "transcription" in resp or
+        (submission or {}).get("assessment_type") == "word_pronunciation"
+    ):
+        return SCORER_MATCH
+    return SCORER_BLEND
+
+
+def response_scorer(resp, include_unversioned=False, submission=None):
+    """
+    Scorer a response is re-graded with, or None if it must be left
+    alone. Versioned responses without a scorer name predate it and
+    were scored by the blend; unversioned ones only count when
+    `include_unversioned` is set, re-scored by the scorer inferred
+    from their shape (see _infer_scorer).
+    """
+    if resp.get("scorer_version") is None:
+        return _infer_scorer(resp, submission) if include_unversioned else None
+    scorer = resp.get("scorer", SCORER_BLEND)
+    return scorer if scorer in SCORER_VERSIONS else None
+
+
+def find_affected(submissions, question_ids=None, include_unversioned=False):
+    """
+    Return (submission_index, response_index) pairs that need re-grading:
+    responses to one of `question_ids`, or scored by an older version of
+    their own scorer.
+    """
+    question_ids = set(question_ids or ())
+    affected = []
+
+    for s_idx, submission in enumerate(submissions):
+        for r_idx, resp in enumerate(submission.get("responses", [])):
+            scorer = response_scorer(resp, include_unversioned, submission)
+            if scorer is None:
+                continue
+            version = resp.get("scorer_version")
+            if (
+                resp.get("question_id") in question_ids or
+                version is None or
+                version < SCORER_VERSIONS[scorer]
+            ):
+                affected.append((s_idx, r_idx))
+
+    return affected
+
+
+def _expected_for(submission, resp):
+    """Current expected text / phonemes, preferring the live catalog."""
+    try:
+        question = get_question(submission.get("assessment_id"), resp.get("question_id"))
+        return question["expected_text"], question.get("expected_phonemes")
+    except (StopIteration, KeyError, OSError):
+        expected = resp.get("expected_text", resp.get("word", ""))
+        return expected, resp.get("expected_phonemes")
+
+
+# --------------------------------------------------
+# WORKER (top-level so it can be pickled)
+# --------------------------------------------------
+def _regrade_one(job):
+    scorer, expected_text, expected_phonemes, spoken_text = job
+
+    if scorer == SCORER_MATCH:
+        score = match_score(expected_text, spoken_text)
+        explanation = generate_explanation(
+            expected_text=expected_text,
+            spoken_text=spoken_text,
+            word_score=score,
+            missing_words=[] if expected_text in spoken_text else [expected_text],
+            extra_words=[],
+            phoneme_score=None
+        )
+        return {
+            "expected_text": expected_text,
+            "score": score,
+            "accuracy": score,
+            "explanation": explanation,
+            "scorer": scorer,
+            "scorer_version": SCORER_VERSIONS[scorer]
+        }
+
+    result = score_text(
+        expected_text=expected_text,
+        actual_text=spoken_text,
+        expected_phonemes=expected_phonemes
+    )
+    score = combine_scores(result["word_score"], result["phoneme_score"])
+
+    explanation = generate_explanation(
+        expected_text=expected_text,
+        spoken_text=spoken_text,
+        word_score=result["word_score"],
+        missing_words=result["missing_words"],
+        extra_words=result["extra_words"],
+        phoneme_score=result["phoneme_score"]
+    )
+
+    return {
+        "expected_text": expected_text,
+        "expected_phonemes": expected_phonemes,
+        "score": score,
+        "accuracy": score,
+        "word_score": result["word_score"],
+        "phoneme_score": result["phoneme_score"],
+        "missing_words": result["missing_words"],
+        "extra_words": result["extra_words"],
+        "explanation": explanation,
+        "scorer": scorer,
+        "scorer_version": SCORER_VERSIONS[scorer]
+    }
+
+
+# --------------------------------------------------
+# JOB
+# --------------------------------------------------
+def regrade(question_ids=None, workers=None, progress=None, dry_run=False,
+            include_unversioned=False):
+    """
+    Re-grade affected submissions and append their new state to the log.
+
+    Args:
+        question_ids: question ids whose expected text / phonemes changed
+        workers: process pool size (default: CPU count)
+        progress: optional callback(done, total)
+        dry_run: only report what would be re-graded
+        include_unversioned: also re-score responses that carry no
+            scorer_version (with the scorer inferred from their shape)
+
+    Returns:
+        dict: summary with affected response / submission counts
+    """
+    submissions = load_results().get("submissions", [])
+
+    affected = find_affected(submissions, question_ids, include_unversioned)
+    touched = sorted({s_idx for s_idx, _ in affected})
+    summary = {
+        "scorer_versions": dict(SCORER_VERSIONS),
+        "responses": len(affected),
+        "submissions": len(touched)
+    }
+
+    if dry_run or not affected:
+        return summary
+
+    jobs = []
+    for s_idx, r_idx in affected:
+        submission = submissions[s_idx]
+        resp = submission["responses"][r_idx]
+        expected_text, expected_phonemes = _expected_for(submission, resp)
+        spoken = resp.get("spoken_text", resp.get("transcription", "")) or ""
+        scorer = response_scorer(resp, include_unversioned, submission)
+        jobs.append((scorer, expected_text, expected_phonemes, spoken))
+
+    total = len(jobs)
+    results = []
+
+    if total < MIN_PARALLEL_JOBS or workers == 1:
+        for job in jobs:
+            results.append(_regrade_one(job))
+            if progress:
+                progress(len(results), total)
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, total // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for out in pool.map(_regrade_one, jobs, chunksize=chunksize):
+                results.append(out)
+                if progress:
+                    progress(len(results), total)
+
+    # -------- APPLY --------
+    now = datetime.now().isoformat()
+    for (s_idx, r_idx), update in zip(affected, results):
+        submissions[s_idx]["responses"][r_idx].update(update)
+
+    for s_idx in touched:
+        submission = submissions[s_idx]
+        scores = [r.get("score", 0) for r in submission.get("responses", [])]
+        if scores:
+            submission["score"] = round(sum(scores) / len(scores), 2)
+            submission["accuracy"] = submission["score"]
+        versions = {r.get("scorer_version") for r in submission.get("responses", [])}
+        if len(versions) == 1:
+            submission["scorer_version"] = versions.pop()
+        submission["regraded_at"] = now
+
+    update_results([submissions[s_idx] for s_idx in touched])
+    return summary
+
+
+# ================================
+# CLI
+# ================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-grade stored submissions")
+    parser.add_argument("--questions", nargs="*", default=[],
+                        help="question ids whose expected text changed")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--include-unversioned", action="store_true",
+                        help="also re-score responses without a scorer_version "
+                             "(scorer inferred from the record)")
+    args = parser.parse_args()
+
+    def _print_progress(done, total):
+        print(f"\r[REGRADE] {done}/{total}", end="", flush=True)
+
+    out = regrade(
+        question_ids=args.questions,
+        workers=args.workers,
+        progress=_print_progress,
+        dry_run=args.dry_run,
+        include_unversioned=args.include_unversioned
+    )
+    print("\n[REGRADE]", out)
@@ -2,4 +2,4 @@
 Core assessment logic
 Includes pronunciation comparison and scoring.
 """
-from .scoring import score_text
+from .scoring import score_text, IncrementalScorer
@@ -0,0 +1,91 @@
+"""
+Precompiled scoring artifacts
+Built once when a question is authored / imported and stored
+alongside it, so scoring only has to process the student's side.
+Only what scoring reads is persisted.
+"""
+
+from ai_app.core.scoring import _normalize_text, _normalize_phonemes
+
+# Bump whenever the layout or the normalization rules change.
+# Stale artifacts are ignored and recompiled on the fly.
+ARTIFACT_SCHEMA_VERSION = 2
+
+
+# --------------------------------------------------
+# COMPILE
+# --------------------------------------------------
+def compile_question(expected_text: str, expected_phonemes: str | None = None) -> dict:
+    """
+    Compile the expected side of a question into scoring artifacts.
+    The result is plain JSON so it can live inside assessments.json.
+    """
+    normalized = _normalize_text(expected_text or "")
+    tokens = normalized.split()
+
+    compiled = {
+        "schema_version": ARTIFACT_SCHEMA_VERSION,
+        "normalized_text": normalized,
+        "tokens": tokens,
+        "phonemes": None
+    }
+
+    if expected_phonemes:
+        compiled["phonemes"] = _normalize_phonemes(expected_phonemes)
+
+    return compiled
+
+
+def is_current(compiled) -> bool:
+    return bool(compiled) and compiled.get("schema_version") == ARTIFACT_SCHEMA_VERSION
+
+
+def get_artifacts(question: dict) -> dict:
+    """
+    Return the stored artifacts of a question, or compile them
+    if they are missing or were built with an older schema.
+    """
+    compiled = question.get("compiled")
+    if is_current(compiled):
+        return compiled
+
+    return compile_question(
+        question.get("expected_text", ""),
+        question.get("expected_phonemes")
+    )
+
+
+def attach_artifacts(question: dict) -> dict:
+    """Compile and store artifacts on a question dict (in place)."""
+    question["compiled"] = compile_question(
+        question.get("expected_text", ""),
+        question.get("expected_phonemes")
+    )
+    return question
+
+
+# --------------------------------------------------
+# CLI: recompile a catalog file
+# --------------------------------------------------
+if __name__ == "__main__":
+    import json
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m ai_app.core.artifacts <assessments.json>")
+        sys.exit(1)
+
+    path = sys.argv[1]
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    count = 0
+    for test in data.get("tests", []):
+        for q in test.get("questions", []):
+            attach_artifacts(q)
+            count += 1
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+    print(f"Compiled {count} questions -> {path}")
@@ -0,0 +1,17 @@
+"""
+Language codes
+Authoring forms and older records store full language names; the
+catalog, RAG partitions and ASR use ISO 639-1 codes.
+"""
+
+LANGUAGE_CODES = {
+    "english": "en",
+    "hindi": "hi",
+    "tamil": "ta"
+}
+
+
+def normalize_language(language):
+    """"English" / "en" / None -> "en" (authoring forms store full names)."""
+    language = (language or "en").strip().lower()
+    return LANGUAGE_CODES.get(language, language)
@@ -0,0 +1,94 @@
+"""
+Score memoization
+Bounded LRU caches for scoring output and generated explanations.
+Identical transcripts for the same question are scored once.
+"""
+
+from ai_app.core.lru import LRUMemo
+from ai_app.core.scoring import score_text, _normalize_text, SCORER_VERSION
+from ai_app.rag.explanation import generate_explanation
+
+
+score_memo = LRUMemo()
+explanation_memo = LRUMemo()
+
+
+# --------------------------------------------------
+# MEMOIZED SCORING
+# --------------------------------------------------
+def memoized_score_text(
+    question_id,
+    expected_text: str,
+    actual_text: str,
+    expected_phonemes: str | None = None,
+    compiled: dict | None = None
+) -> dict:
+    """
+    score_text() keyed on (question_id, scorer version, normalized transcript).
+    The result depends on the transcript only through its normalized
+    form, so "Apple." and "apple" share one entry. The expected side is
+    part of the key too, so an edited question never serves stale scores.
+    The returned dict is shared between callers: treat it as read-only.
+    """
+    key = (
+        question_id,
+        SCORER_VERSION,
+        expected_text,
+        expected_phonemes,
+        _normalize_text(actual_text or "")
+    )
+
+    return score_memo.get_or_compute(
+        key,
+        lambda: score_text(
+            expected_text=expected_text,
+            actual_text=actual_text,
+            expected_phonemes=expected_phonemes,
+            compiled=compiled
+        )
+    )
+
+
+def memoized_explanation(
+    question_id,
+    expected_text: str,
+    spoken_text: str,
+    word_score: float,
+    missing_words: list,
+    extra_words: list,
+    phoneme_score: float | None = None
+) -> str:
+    """
+    generate_explanation() keyed on the question, scorer version and
+    normalized transcript, plus every other input it renders.
+    """
+    key = (
+        question_id,
+        SCORER_VERSION,
+        _normalize_text(spoken_text or ""),
+        spoken_text,
+        expected_text,
+        word_score,
+        phoneme_score,
+        tuple(missing_words or ()),
+        tuple(extra_words or ())
+    )
+
+    return explanation_memo.get_or_compute(
+        key,
+        lambda: generate_explanation(
+            expected_text=expected_text,
+            spoken_text=spoken_text,
+            word_score=word_score,
+            missing_words=missing_words,
+            extra_words=extra_words,
+            phoneme_score=phoneme_score
+        )
+    )
+
+
+def memo_stats() -> dict:
+    return {
+        "score": score_memo.stats(),
+        "explanation": explanation_memo.stats()
+    }
@@ -1,6 +1,23 @@
 import difflib
 import re
 
+# Bump whenever scoring output can change for the same input.
+# Used as part of memo keys and to find submissions to re-grade.
+SCORER_VERSION = 1
+
+# Scorers, stamped on each response next to their own version so
+# re-grading only ever re-runs the scorer that produced a score.
+SCORER_BLEND = "blend"   # score_text + combine_scores
+SCORER_MATCH = "match"   # whole-word match (student assessment page)
+MATCH_SCORER_VERSION = 1
+
+# match_score(): exact / contained / anything else
+MATCH_SCORES = (100, 80, 40)
+
+# Final score blend (word-level vs phoneme-level accuracy)
+WORD_WEIGHT = 0.6
+PHONEME_WEIGHT = 0.4
+
 # --------------------------------------------------
 # TEXT NORMALIZATION
 # --------------------------------------------------
@@ -51,17 +68,27 @@ def approximate_phonemes(text: str) -> list:
 def score_text(
     expected_text: str,
     actual_text: str,
-    expected_phonemes: str | None = None
+    expected_phonemes: str | None = None,
+    compiled: dict | None = None
 ) -> dict:
+    """
+    Score a transcript against the expected text / phonemes.
+    `compiled` are the precomputed artifacts of the question
+    (see ai_app.core.artifacts); when given, the expected side
+    is not re-normalized.
+    """
 
     # -------- WORD LEVEL --------
-    expected_norm = _normalize_text(expected_text)
+    if compiled:
+        expected_norm = compiled["normalized_text"]
+    else:
+        expected_norm = _normalize_text(expected_text)
     actual_norm = _normalize_text(actual_text)
 
     word_matcher = difflib.SequenceMatcher(None, expected_norm, actual_norm)
     word_score = round(word_matcher.ratio() * 100, 2)
 
-    expected_words = expected_norm.split()
+    expected_words = compiled["tokens"] if compiled else expected_norm.split()
     actual_words = actual_norm.split()
 
     missing_words = [w for w in expected_words if w not in actual_words]
@@ -71,8 +98,14 @@ def score_text(
     phoneme_score = None
     phoneme_analysis = None
 
-    if expected_phonemes:
+    if compiled and compiled.get("phonemes"):
+        expected_ph = compiled["phonemes"]
+    elif expected_phonemes:
         expected_ph = _normalize_phonemes(expected_phonemes)
+    else:
+        expected_ph = None
+
+    if expected_ph:
         spoken_ph = approximate_phonemes(actual_text)
 
         ph_matcher = difflib.SequenceMatcher(None, expected_ph, spoken_ph)
@@ -82,7 +115,7 @@ def score_text(
         extra_phonemes = [p for p in spoken_ph if p not in expected_ph]
 
         phoneme_analysis = {
-            "expected_phonemes": expected_ph,
+            "expected_phonemes": list(expected_ph),
             "spoken_phonemes": spoken_ph,
             "missing_phonemes": missing_phonemes,
             "extra_phonemes": extra_phonemes
@@ -95,3 +128,166 @@ def score_text(
         "extra_words": extra_words,
         "phoneme_analysis": phoneme_analysis
     }
+
+
+# --------------------------------------------------
+# FINAL COMBINED SCORE
+# --------------------------------------------------
+def combine_scores(word_score: float, phoneme_score: float | None) -> float:
+    """
+    Blend word and phoneme accuracy into the final score.
+    A missing phoneme score counts as 0 (same as the RAG layer).
+    """
+    return round(
+        WORD_WEIGHT * word_score +
+        PHONEME_WEIGHT * (phoneme_score if phoneme_score is not None else 0),
+        2
+    )
+
+
+# --------------------------------------------------
+# WORD MATCH SCORE
+# --------------------------------------------------
+def match_score(expected_text: str, spoken_text: str) -> int:
+    """Coarse score of a single spoken word (see MATCH_SCORES)."""
+    expected = expected_text.lower().strip()
+    spoken = spoken_text.lower().strip()
+
+    if spoken == expected:
+        return MATCH_SCORES[0]
+    if expected in spoken:
+        return MATCH_SCORES[1]
+    return MATCH_SCORES[2]
+
+
+# --------------------------------------------------
+# INCREMENTAL SCORING (LIVE FEEDBACK)
+# --------------------------------------------------
+class _LCSFrontier:
+    """
+    Longest-common-subsequence DP over a fixed expected sequence,
+    extended one spoken item at a time. Each append costs
+    O(len(expected)); earlier rows are kept for the alignment.
+    """
+
+    def __init__(self, expected):
+        self.expected = list(expected)
+        self.spoken = []
+        self.rows = [[0] * (len(self.expected) + 1)]
+
+    def extend(self, items):
+        expected = self.expected
+        for item in items:
+            prev = self.rows[-1]
+            row = [0] * (len(expected) + 1)
+            for j in range(1, len(expected) + 1):
+                if expected[j - 1] == item:
+                    row[j] = prev[j - 1] + 1
+                else:
+                    row[j] = prev[j] if prev[j] >= row[j - 1] else row[j - 1]
+            self.rows.append(row)
+            self.spoken.append(item)
+
+    def ratio(self) -> float:
+        """2 * LCS / (len(a) + len(b)), same scale as difflib's ratio()."""
+        total = len(self.expected) + len(self.spoken)
+        if not total:
+            return 1.0
+        return 2.0 * self.rows[-1][-1] / total
+
+    def alignment(self) -> list:
+        """Trace back the DP into (op, expected_item, spoken_item) steps."""
+        steps = []
+        i, j = len(self.spoken), len(self.expected)
+        while i > 0 or j > 0:
+            if i > 0 and j > 0 and self.spoken[i - 1] == self.expected[j - 1]:
+                steps.append(("match", self.expected[j - 1], self.spoken[i - 1]))
+                i, j = i - 1, j - 1
+            elif j > 0 and (i == 0 or self.rows[i][j - 1] >= self.rows[i - 1][j]):
+                steps.append(("missing", self.expected[j - 1], None))
+                j -= 1
+            else:
+                steps.append(("extra", None, self.spoken[i - 1]))
+                i -= 1
+        steps.reverse()
+        return steps
+
+
+class IncrementalScorer:
+    """
+    Stateful scorer for partial ASR output.
+    Feed transcript tokens as they arrive; running scores are updated
+    by extending the DP frontier instead of rescoring the whole string.
+
+    Running scores use an exact LCS ratio, which can differ slightly
+    from difflib's heuristic. Call finalize() for the authoritative
+    score_text() result once the utterance is complete.
+    """
+
+    def __init__(
+        self,
+        expected_text: str,
+        expected_phonemes: str | None = None,
+        compiled: dict | None = None
+    ):
+        self.expected_text = expected_text
+        self.expected_phonemes = expected_phonemes
+        self.compiled = compiled
+
+        if compiled:
+            expected_norm = compiled["normalized_text"]
+            expected_ph = compiled.get("phonemes")
+        else:
+            expected_norm = _normalize_text(expected_text)
+            expected_ph = _normalize_phonemes(expected_phonemes) if expected_phonemes else None
+
+        self.expected_words = expected_norm.split()
+        self._chars = _LCSFrontier(expected_norm)
+        self._phonemes = _LCSFrontier(expected_ph) if expected_ph else None
+        self.tokens = []
+
+    def feed(self, text: str) -> dict:
+        """Append newly recognized text and return the running scores."""
+        for token in _normalize_text(text or "").split():
+            sep = [" "] if self.tokens else []
+
+            self._chars.extend(sep + list(token))
+            if self._phonemes is not None:
+                self._phonemes.extend(sep + approximate_phonemes(token))
+
+            self.tokens.append(token)
+
+        return self.scores()
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.tokens)
+
+    def scores(self) -> dict:
+        word_score = round(self._chars.ratio() * 100, 2)
+        phoneme_score = None
+        if self._phonemes is not None:
+            phoneme_score = round(self._phonemes.ratio() * 100, 2)
+
+        spoken = set(self.tokens)
+        return {
+            "word_score": word_score,
+            "phoneme_score": phoneme_score,
+            "score": combine_scores(word_score, phoneme_score),
+            "missing_words": [w for w in self.expected_words if w not in spoken],
+            "extra_words": [w for w in self.tokens if w not in self.expected_words]
+        }
+
+    def alignment(self) -> dict:
+        return {
+            "text": self._chars.alignment(),
+            "phonemes": self._phonemes.alignment() if self._phonemes is not None else None
+        }
+
+    def finalize(self) -> dict:
+        return score_text(
+            expected_text=self.expected_text,
+            actual_text=self.transcript,
+            expected_phonemes=self.expected_phonemes,
+            compiled=self.compiled
+        )
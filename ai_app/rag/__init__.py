@@ -2,5 +2,5 @@
 RAG module
 Used for explainable summaries and feedback generation.
 """
-from .chatbot import rag_chatbot
+from .chatbot import rag_chatbot, rag_chatbot_batch
 from .explanation import generate_explanation
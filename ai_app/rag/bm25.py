@@ -0,0 +1,214 @@
+"""
+BM25 lexical retriever (zero-model fallback).
+Inverted index stored in flat typed arrays, so it is compact on disk
+and cheap to load on UI workers that should not hold an embedding
+model. Same interface as VectorRetriever: search() / search_batch()
+return (chunk_id, score, text) tuples.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+from array import array
+from collections import Counter
+
+from ai_app.rag.knowledge_loader import get_corpus, DEFAULT_LANGUAGE
+from ai_app.rag.vector_index import DEFAULT_TOP_K, index_dir_for
+
+META_FILE = "bm25.json"
+POSTINGS_FILE = "bm25.bin"
+
+K1 = 1.5
+B = 0.75
+
+# Word characters plus the ranges \w misses:
+# combining diacritics (t̪), spacing modifiers (ʰ ː), IPA extensions
+# and the whole Devanagari block (matras / virama are combining marks).
+_TOKEN_RE = re.compile(
+    r"[\w\u0300-\u036f\u02b0-\u02ff\u0250-\u02af\u0900-\u097f]+"
+)
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").casefold())
+
+
+# ===============================
+# INDEX
+# ===============================
+class BM25Retriever:
+    """
+    Postings for term t live in doc_ids / tfs[offsets[t]:offsets[t + 1]].
+    """
+
+    def __init__(self, terms, offsets, doc_ids, tfs, doc_lens, texts, k1=K1, b=B,
+                 content_hash=None):
+        self.terms = terms
+        self.term_ids = {t: i for i, t in enumerate(terms)}
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lens = doc_lens
+        self.texts = texts
+        self.k1 = k1
+        self.b = b
+        # Knowledge content the index was built from (KnowledgeCorpus.content_hash)
+        self.content_hash = content_hash
+
+        n = len(doc_lens)
+        self.avgdl = (sum(doc_lens) / n) if n else 0.0
+        self.idf = array("f", (
+            math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for df in (offsets[i + 1] - offsets[i] for i in range(len(terms)))
+        ))
+
+    @classmethod
+    def from_texts(cls, texts, k1=K1, b=B, content_hash=None):
+        postings = {}
+        doc_lens = array("I")
+
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_lens.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        terms = sorted(postings)
+        offsets = array("I", [0])
+        doc_ids = array("I")
+        tfs = array("H")
+
+        for term in terms:
+            for doc_id, tf in postings[term]:
+                doc_ids.append(doc_id)
+                tfs.append(min(tf, 0xFFFF))
+            offsets.append(len(doc_ids))
+
+        return cls(terms, offsets, doc_ids, tfs, doc_lens, list(texts), k1, b, content_hash)
+
+    @classmethod
+    def from_chunks(cls, chunks, k1=K1, b=B, content_hash=None):
+        return cls.from_texts([c.text for c in chunks], k1, b, content_hash)
+
+    @classmethod
+    def from_corpus(cls, corpus, k1=K1, b=B):
+        return cls.from_chunks(corpus.chunks, k1, b, corpus.content_hash)
+
+    # -------------------------------
+    # PERSISTENCE
+    # -------------------------------
+    def save(self, index_dir):
+        os.makedirs(index_dir, exist_ok=True)
+
+        meta = {
+            "k1": self.k1,
+            "b": self.b,
+            "content_hash": self.content_hash,
+            "terms": self.terms,
+            "texts": self.texts,
+            "sizes": [len(self.offsets), len(self.doc_ids), len(self.doc_lens)]
+        }
+        with open(os.path.join(index_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        with open(os.path.join(index_dir, POSTINGS_FILE), "wb") as f:
+            self.offsets.tofile(f)
+            self.doc_ids.tofile(f)
+            self.tfs.tofile(f)
+            self.doc_lens.tofile(f)
+
+    @staticmethod
+    def saved_hash(index_dir):
+        """content_hash recorded with a saved index (None if absent)."""
+        try:
+            with open(os.path.join(index_dir, META_FILE), encoding="utf-8") as f:
+                return json.load(f).get("content_hash")
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def load(cls, index_dir):
+        with open(os.path.join(index_dir, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        n_offsets, n_postings, n_docs = meta["sizes"]
+        offsets, doc_ids, tfs, doc_lens = array("I"), array("I"), array("H"), array("I")
+
+        with open(os.path.join(index_dir, POSTINGS_FILE), "rb") as f:
+            offsets.fromfile(f, n_offsets)
+            doc_ids.fromfile(f, n_postings)
+            tfs.fromfile(f, n_postings)
+            doc_lens.fromfile(f, n_docs)
+
+        return cls(meta["terms"], offsets, doc_ids, tfs, doc_lens,
+                   meta["texts"], meta["k1"], meta["b"], meta.get("content_hash"))
+
+    # -------------------------------
+    # QUERY
+    # -------------------------------
+    def search(self, query, k=DEFAULT_TOP_K):
+        scores = {}
+        k1, b, avgdl = self.k1, self.b, self.avgdl or 1.0
+
+        for term in set(tokenize(query)):
+            t = self.term_ids.get(term)
+            if t is None:
+                continue
+            idf = self.idf[t]
+            for p in range(self.offsets[t], self.offsets[t + 1]):
+                doc = self.doc_ids[p]
+                tf = self.tfs[p]
+                norm = k1 * (1 - b + b * self.doc_lens[doc] / avgdl)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(doc, score, self.texts[doc]) for doc, score in best]
+
+    def search_batch(self, queries, k=DEFAULT_TOP_K):
+        return [self.search(q, k) for q in queries]
+
+
+# ===============================
+# PER-PARTITION INSTANCE
+# ===============================
+def get_bm25_retriever(language=DEFAULT_LANGUAGE):
+    """
+    BM25 over a language's knowledge partition: loaded from disk when
+    a saved index was built from the current knowledge content,
+    otherwise built in memory (cheap). Stored on the partition, so it
+    is rebuilt when the corpus changes and freed when the partition is
+    evicted.
+    """
+    corpus = get_corpus(language)
+    retriever = corpus.derived.get("bm25")
+
+    if retriever is None:
+        index_dir = index_dir_for(corpus.language)
+        if (
+            os.path.exists(os.path.join(index_dir, POSTINGS_FILE)) and
+            BM25Retriever.saved_hash(index_dir) == corpus.content_hash
+        ):
+            retriever = BM25Retriever.load(index_dir)
+        else:
+            retriever = BM25Retriever.from_corpus(corpus)
+        corpus.derived["bm25"] = retriever
+
+    return retriever
+
+
+# ================================
+# CLI
+# ================================
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("Usage: python -m ai_app.rag.bm25 build [language]")
+        sys.exit(1)
+
+    language = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_LANGUAGE
+    index_dir = index_dir_for(language)
+    BM25Retriever.from_corpus(get_corpus(language)).save(index_dir)
+    print("BM25 index written to:", index_dir)
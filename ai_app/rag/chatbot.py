@@ -1,12 +1,87 @@
-from ai_app.rag.retriever import retrieve_context
+from ai_app.core.scoring import combine_scores
+from ai_app.rag.knowledge_loader import get_corpus
+from ai_app.rag.profile import extract_profile
+from ai_app.rag.response_cache import response_cache, fingerprint
+from ai_app.rag.retriever import retrieve_context_batch, profile_key
+from ai_app.rag.vector_index import index_identity
 
 
-def rag_chatbot(user_question, assessment_result):
+def knowledge_state(language):
+    """Process-independent identity of a partition's knowledge and index."""
+    return [get_corpus(language).content_hash, index_identity(language)]
+
+
+def _safe_score(assessment_result):
+    word_score = assessment_result.get("word_score", 0)
+    phoneme_score = assessment_result.get("phoneme_score")
+
+    # Compute score safely if missing (defensive design)
+    return assessment_result.get(
+        "score",
+        combine_scores(word_score, phoneme_score)
+    )
+
+
+def detect_intent(user_question):
+    """Keyword intent of the question: "why", "improve" or "general"."""
+    user_q = user_question.lower()
+    if "why" in user_q:
+        return "why"
+    if "improve" in user_q or "how" in user_q:
+        return "improve"
+    return "general"
+
+
+def rag_chatbot(user_question, assessment_result, retriever="auto"):
     """
     Generate a focused, question-aware explanation
     using system analysis + retrieved therapy knowledge.
+    `retriever` selects the knowledge backend (see retriever.get_retriever).
     """
+    return rag_chatbot_batch(user_question, [assessment_result], retriever)[0]
+
 
+def rag_chatbot_batch(user_question, assessment_results, retriever="auto"):
+    """
+    rag_chatbot() for many results: replies come from the response
+    cache when possible; the remaining retrievals are grouped by error
+    profile and batched. Replies are aligned with the input order.
+    """
+    intent = detect_intent(user_question)
+
+    scored = [
+        {**r, "score": _safe_score(r)}  # Ensure retriever always receives score
+        for r in assessment_results
+    ]
+
+    replies = [None] * len(scored)
+    keys = []
+    misses = []
+    states = {}
+
+    for i, r in enumerate(scored):
+        profile = extract_profile(r)
+        # Keyed on content, not in-process versions: entries are persisted
+        language = profile["language"]
+        if language not in states:
+            states[language] = knowledge_state(language)
+        key = fingerprint(intent, r, profile_key(profile), states[language], retriever)
+        keys.append(key)
+        replies[i] = response_cache.get(key)
+        if replies[i] is None:
+            misses.append(i)
+
+    if misses:
+        retrieved = retrieve_context_batch([scored[i] for i in misses], retriever=retriever)
+        for i, ctx in zip(misses, retrieved):
+            replies[i] = _compose_response(intent, scored[i], ctx)
+            response_cache.put(keys[i], replies[i])
+        response_cache.persist()
+
+    return replies
+
+
+def _compose_response(intent, assessment_result, retrieved):
     response = []
 
     # ---------------------------
@@ -14,25 +89,14 @@ def rag_chatbot(user_question, assessment_result):
     # ---------------------------
     word_score = assessment_result.get("word_score", 0)
     phoneme_score = assessment_result.get("phoneme_score")
-
-    # Compute score safely if missing (defensive design)
-    score = assessment_result.get(
-        "score",
-        round(
-            0.6 * word_score +
-            0.4 * (phoneme_score if phoneme_score is not None else 0),
-            2
-        )
-    )
-
-    user_q = user_question.lower()
+    score = assessment_result["score"]
 
     # ============================
     # 1️⃣ DIRECT ANSWER (QUESTION-AWARE)
     # ============================
     response.append("💡 Direct Answer:")
 
-    if "why" in user_q:
+    if intent == "why":
         response.append(
             f"You lost marks because your spoken pronunciation did not fully "
             f"match the expected word and sound patterns. "
@@ -48,7 +112,7 @@ def rag_chatbot(user_question, assessment_result):
                 f"Phoneme-level accuracy: {phoneme_score}%."
             )
 
-    elif "improve" in user_q or "how" in user_q:
+    elif intent == "improve":
         response.append(
             "To improve your pronunciation, speak slowly, exaggerate mouth "
             "movements initially, and repeat the word while focusing on "
@@ -71,11 +135,6 @@ def rag_chatbot(user_question, assessment_result):
     # ============================
     response.append("\n📚 Therapy Guidance:")
 
-    retrieved = retrieve_context({
-        **assessment_result,
-        "score": score  # Ensure retriever always receives score
-    })
-
     if retrieved:
         for item in retrieved:
             response.append(f"- {item}")
@@ -0,0 +1,242 @@
+"""
+Generative SOAP-style summaries.
+Pluggable streaming backends (local stub, OpenAI, Groq) behind one
+SummaryGenerator that adds a prompt/result cache, a concurrency limit
+and a per-request token budget. The stub is deterministic and needs no
+network, so summaries work offline and in tests.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+
+from ai_app.core.lru import LRUMemo
+from ai_app.rag.profile import extract_profile
+from ai_app.rag.retriever import retrieve_context
+
+GENERATOR_BACKEND = os.environ.get("RAG_GENERATOR", "stub")
+GENERATOR_MODEL = os.environ.get("RAG_GENERATOR_MODEL")
+
+MAX_CONCURRENT_REQUESTS = 4
+# Seconds to wait for a free backend slot before giving up
+SLOT_TIMEOUT = 30.0
+MAX_TOKENS_PER_REQUEST = 400
+SUMMARY_CACHE_SIZE = 1024
+
+SYSTEM_PROMPT = (
+    "You are a speech-language therapy assistant. Write a short SOAP note "
+    "(Subjective, Objective, Assessment, Plan) for a pronunciation attempt. "
+    "Use only the facts and guidance provided. Do not invent scores."
+)
+
+
+# ===============================
+# PROMPT
+# ===============================
+def build_soap_prompt(result, context):
+    """Grounded prompt: assessment facts + retrieved guidance only."""
+    profile = extract_profile(result)
+    facts = {
+        "expected": result.get("expected_text"),
+        "spoken": result.get("spoken_text"),
+        "score": profile["score"],
+        "word_score": result.get("word_score"),
+        "phoneme_score": result.get("phoneme_score"),
+        "missing_words": profile["missing_words"],
+        "extra_words": profile["extra_words"],
+        "missing_phonemes": profile["missing_phonemes"],
+        "extra_phonemes": profile["extra_phonemes"],
+        "items": [
+            {"word": r.get("word"), "spoken": r.get("spoken_text"), "score": r.get("score")}
+            for r in result.get("responses", [])
+        ]
+    }
+
+    return (
+        "Assessment facts (JSON):\n"
+        + json.dumps(facts, ensure_ascii=False, sort_keys=True)
+        + "\n\nTherapy guidance:\n"
+        + "\n".join(f"- {c}" for c in context)
+    )
+
+
+# ===============================
+# BACKENDS
+# ===============================
+class GeneratorBackend(ABC):
+    """Streams text pieces for a request ({prompt, result, context})."""
+
+    name = "base"
+    model = None
+
+    @abstractmethod
+    def stream(self, request, max_tokens):
+        """Yield text pieces, at most about `max_tokens` of them."""
+
+
+class LocalStubBackend(GeneratorBackend):
+    """
+    Deterministic template SOAP note built from the request facts.
+    Streams word by word so the UI path is the same as a real model.
+    """
+
+    name = "stub"
+
+    def stream(self, request, max_tokens):
+        result = request["result"]
+        profile = extract_profile(result)
+
+        items = result.get("responses", [])
+        if items:
+            observed = "; ".join(
+                f"{r.get('word', '')} -> {r.get('spoken_text', '')} ({r.get('score')}%)"
+                for r in items
+            )
+        else:
+            observed = f"{result.get('expected_text', '')} -> {result.get('spoken_text', '')}"
+
+        errors = profile["missing_words"] + profile["missing_phonemes"]
+        lines = [
+            "S: Student completed a pronunciation attempt.",
+            f"O: Overall score {profile['score']}%. {observed}.",
+            f"A: {profile['band'].capitalize()} accuracy"
+            + (f"; difficulty with {', '.join(errors)}." if errors else "."),
+            "P: " + (" ".join(request["context"][-1:]) or "Continue regular practice.")
+        ]
+
+        for token in "\n".join(lines).split(" ")[:max_tokens]:
+            yield token + " "
+
+
+class OpenAIBackend(GeneratorBackend):
+    name = "openai"
+
+    def __init__(self, model=None):
+        from openai import OpenAI
+        self.client = OpenAI()
+        self.model = model or "gpt-4o-mini"
+
+    def stream(self, request, max_tokens):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": request["prompt"]}
+            ],
+            max_tokens=max_tokens,
+            temperature=0,
+            stream=True
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class GroqBackend(OpenAIBackend):
+    name = "groq"
+
+    def __init__(self, model=None):
+        from groq import Groq
+        self.client = Groq()
+        self.model = model or "llama-3.1-8b-instant"
+
+
+BACKENDS = {
+    "stub": LocalStubBackend,
+    "openai": OpenAIBackend,
+    "groq": GroqBackend
+}
+
+
+# ===============================
+# GENERATOR
+# ===============================
+class SummaryGenerator:
+    """
+    Streams summaries from a backend with caching, a concurrency
+    limit and a token budget. Only completed summaries are cached.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        max_concurrent=MAX_CONCURRENT_REQUESTS,
+        max_tokens=MAX_TOKENS_PER_REQUEST,
+        cache_size=SUMMARY_CACHE_SIZE,
+        slot_timeout=SLOT_TIMEOUT
+    ):
+        self.backend = backend or LocalStubBackend()
+        self.max_tokens = max_tokens
+        self.slot_timeout = slot_timeout
+        self.cache = LRUMemo(cache_size)
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def _cache_key(self, prompt, max_tokens):
+        raw = json.dumps([self.backend.name, self.backend.model, max_tokens, prompt],
+                         ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def stream_summary(self, result, context=None, max_tokens=None, retriever="auto"):
+        """
+        Yield summary text pieces (for st.write_stream).
+        Without `context`, guidance is retrieved with `retriever`
+        (see retriever.get_retriever; UI workers pass "bm25" so they
+        never load the embedding model). Raises TimeoutError if no backend slot frees up within
+        slot_timeout; the slot is released even if the consumer stops
+        iterating early.
+        """
+        if context is None:
+            context = retrieve_context(result, retriever)
+
+        max_tokens = min(max_tokens or self.max_tokens, self.max_tokens)
+        prompt = build_soap_prompt(result, context)
+        key = self._cache_key(prompt, max_tokens)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        request = {"prompt": prompt, "result": result, "context": list(context)}
+        pieces = []
+
+        if not self._slots.acquire(timeout=self.slot_timeout):
+            raise TimeoutError(f"summary backend busy ({self.backend.name})")
+        try:
+            for i, piece in enumerate(self.backend.stream(request, max_tokens)):
+                # Budget guard for backends that stream more than asked
+                if i >= max_tokens:
+                    break
+                pieces.append(piece)
+                yield piece
+        finally:
+            self._slots.release()
+
+        self.cache.put(key, "".join(pieces))
+
+    def summarize(self, result, context=None, max_tokens=None, retriever="auto"):
+        return "".join(self.stream_summary(result, context, max_tokens, retriever))
+
+
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def get_generator():
+    """Process-wide generator for the configured backend (stub fallback)."""
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                try:
+                    if GENERATOR_BACKEND == "stub":
+                        backend = LocalStubBackend()
+                    else:
+                        backend = BACKENDS[GENERATOR_BACKEND](GENERATOR_MODEL)
+                except Exception as e:
+                    print(f"[RAG] Warning: generator '{GENERATOR_BACKEND}' unavailable -> {e}")
+                    backend = LocalStubBackend()
+                _generator = SummaryGenerator(backend)
+    return _generator
@@ -0,0 +1,254 @@
+"""
+Incremental knowledge indexer.
+Tracks a content hash per chunk and, when the knowledge files change,
+re-embeds only added / changed chunks, removes deleted ones, writes
+the index atomically and swaps it into the live retriever while
+queries keep running. A polling watcher drives it from file changes;
+serving processes pick up the republished file on their own (see
+vector_index.get_vector_retriever). The quantization of the stored
+index (flat / sq8 / ivfpq) is kept.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from ai_app.rag.knowledge_loader import get_corpus, partitions, DEFAULT_LANGUAGE
+from ai_app.utils.storage import atomic_write
+from ai_app.rag import vector_index
+from ai_app.rag.vector_index import (
+    FAISS_AVAILABLE, INDEX_FILE, META_FILE, EMBED_MODEL, DEFAULT_NPROBE,
+    VectorRetriever, embed, index_dir_for, make_index
+)
+
+if FAISS_AVAILABLE:
+    import numpy as np
+    import faiss
+
+WATCH_INTERVAL = 2.0
+
+
+def chunk_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def hash_to_id(digest):
+    """Stable, non-negative int64 FAISS id derived from the content hash."""
+    return int(digest[:16], 16) & 0x7FFFFFFFFFFFFFFF
+
+
+# ===============================
+# INDEXER
+# ===============================
+class IncrementalIndexer:
+    """
+    Owns a writable copy of one language partition's index, keyed by
+    content hash (IndexIDMap2 around flat / sq8 codes; IVF-PQ takes
+    ids natively). Serving processes keep reading the published file.
+    """
+
+    def __init__(self, language=DEFAULT_LANGUAGE, model_name=EMBED_MODEL, quantization=None):
+        if not FAISS_AVAILABLE:
+            raise RuntimeError("faiss-cpu and numpy are required for the incremental indexer")
+
+        self.language = language
+        self.index_dir = index_dir_for(language)
+        self.model_name = model_name
+        self.index = None
+        self.entries = {}  # content hash -> chunk meta
+        # None: keep whatever the stored index uses (flat if there is none)
+        self.quantization = quantization
+        self._lock = threading.Lock()
+        self._load()
+        self.quantization = self.quantization or "flat"
+
+    def _load(self):
+        index_path = os.path.join(self.index_dir, INDEX_FILE)
+        meta_path = os.path.join(self.index_dir, META_FILE)
+        if not (os.path.exists(index_path) and os.path.exists(meta_path)):
+            return
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.quantization = self.quantization or meta.get("quantization", "flat")
+
+        # Indexes from a one-shot build have positional ids and no hashes
+        # (or another model / quantization): ignore them and let the
+        # first sync rebuild everything with the same quantization.
+        if (
+            meta.get("model") != self.model_name or
+            meta.get("quantization", "flat") != self.quantization or
+            not all("hash" in c for c in meta["chunks"])
+        ):
+            return
+
+        self.index = faiss.read_index(index_path)
+        self.entries = {c["hash"]: c for c in meta["chunks"]}
+
+    def sync(self, chunks=None):
+        """
+        Bring the index in line with `chunks` (default: the partition corpus).
+
+        Returns:
+            dict: counts of added / removed / unchanged chunks
+        """
+        chunks = chunks if chunks is not None else get_corpus(self.language).chunks
+
+        with self._lock:
+            current = {}
+            for c in chunks:
+                digest = chunk_hash(c.text)
+                current.setdefault(digest, {
+                    "id": hash_to_id(digest),
+                    "hash": digest,
+                    "source": c.source,
+                    "text": c.text
+                })
+
+            added = [h for h in current if h not in self.entries]
+            removed = [h for h in self.entries if h not in current]
+            summary = {
+                "added": len(added),
+                "removed": len(removed),
+                "unchanged": len(current) - len(added)
+            }
+
+            if self.index is not None and not added and not removed:
+                return summary
+
+            if added:
+                vectors = embed([current[h]["text"] for h in added], self.model_name)
+                if self.index is None:
+                    self.index = self._new_index(vectors)
+                ids = np.array([current[h]["id"] for h in added], dtype="int64")
+                self.index.add_with_ids(vectors, ids)
+
+            if removed and self.index is not None:
+                ids = np.array([self.entries[h]["id"] for h in removed], dtype="int64")
+                self.index.remove_ids(ids)
+
+            self.entries = current
+            self._publish()
+            return summary
+
+    def _new_index(self, vectors):
+        """Empty id-keyed index in self.quantization, trained on `vectors`."""
+        # make_index may fall back (ivfpq -> sq8 on small corpora)
+        index, self.quantization = make_index(vectors, self.quantization)
+        if self.quantization == "ivfpq":
+            # IVF stores ids itself and removes them without renumbering
+            return index
+        return faiss.IndexIDMap2(index)
+
+    def _publish(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        chunks = list(self.entries.values())
+        meta = {
+            "model": self.model_name,
+            "dim": int(self.index.d),
+            "quantization": self.quantization,
+            "chunks": chunks
+        }
+        if self.quantization == "ivfpq":
+            meta["nprobe"] = faiss.extract_index_ivf(self.index).nprobe or DEFAULT_NPROBE
+
+        # Meta first: a reader pairing new meta with the old index only
+        # loses ids that were removed anyway (unknown ids are skipped).
+        atomic_write(
+            os.path.join(self.index_dir, META_FILE),
+            json.dumps(meta, ensure_ascii=False, indent=2)
+        )
+        atomic_write(
+            os.path.join(self.index_dir, INDEX_FILE),
+            faiss.serialize_index(self.index).tobytes()
+        )
+
+        # Serve from an in-memory clone so later syncs never mutate
+        # an index that queries are running against
+        live = VectorRetriever(faiss.clone_index(self.index), chunks, self.model_name)
+        vector_index.swap_vector_retriever(live, self.language)
+
+
+# ===============================
+# FILE WATCHING
+# ===============================
+class KnowledgeWatcher(threading.Thread):
+    """
+    Polls the loaded language partitions and syncs each one's index
+    when its corpus changes. Evicted partitions are simply skipped.
+    """
+
+    def __init__(self, interval=WATCH_INTERVAL):
+        super().__init__(name="knowledge-watcher", daemon=True)
+        self.interval = interval
+        self.indexers = {}
+        self._stop_event = threading.Event()
+        self._seen = {}
+
+    def poll(self):
+        for language in partitions.loaded():
+            corpus = get_corpus(language)
+            # A re-loaded partition is a new corpus object: track both
+            state = (id(corpus), corpus.version)
+            if self._seen.get(language) == state:
+                continue
+
+            indexer = self.indexers.get(language)
+            if indexer is None:
+                indexer = self.indexers[language] = IncrementalIndexer(language)
+
+            summary = indexer.sync(corpus.chunks)
+            self._seen[language] = state
+            print(f"[RAG] Knowledge index synced ({language}) -> {summary}")
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"[RAG] Warning: knowledge index sync failed -> {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def start_watcher(interval=WATCH_INTERVAL):
+    """Start the process-wide watcher once; returns None without faiss."""
+    global _watcher
+    if not FAISS_AVAILABLE:
+        return None
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = KnowledgeWatcher(interval)
+            _watcher.start()
+    return _watcher
+
+
+# ================================
+# CLI
+# ================================
+if __name__ == "__main__":
+    import sys
+    import time
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    language = args[0] if args else DEFAULT_LANGUAGE
+
+    print("[RAG]", IncrementalIndexer(language).sync())
+
+    if "--watch" in sys.argv:
+        get_corpus(language)  # make sure the partition is loaded
+        watcher = start_watcher()
+        print("[RAG] Watching knowledge files (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            watcher.stop()
@@ -0,0 +1,133 @@
+"""
+Knowledge ingestion pipeline.
+Splits source files into size-bounded chunks, drops near-duplicates
+with MinHash + LSH banding (roughly linear in the number of chunks)
+and records where every kept chunk, and each dropped copy, came from.
+"""
+
+import random
+import re
+import zlib
+
+MAX_CHUNK_WORDS = 80
+
+SHINGLE_SIZE = 5  # characters; robust for short chunks and Devanagari
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+DUPLICATE_THRESHOLD = 0.8  # estimated Jaccard similarity
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+# ===============================
+# CHUNKING
+# ===============================
+def chunk_text(content, max_words=MAX_CHUNK_WORDS):
+    """
+    Yield (text, start_line) chunks: one per paragraph, with long
+    paragraphs packed line by line into chunks of at most `max_words`.
+    """
+    lines = content.split("\n")
+    paragraph = []
+
+    def flush():
+        current, start, words = [], None, 0
+        for line_no, line in paragraph:
+            n = len(line.split())
+            if current and words + n > max_words:
+                yield "\n".join(current), start
+                current, start, words = [], None, 0
+            if start is None:
+                start = line_no
+            current.append(line)
+            words += n
+        if current:
+            yield "\n".join(current), start
+
+    for line_no, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if line:
+            paragraph.append((line_no, line))
+        elif paragraph:
+            yield from flush()
+            paragraph = []
+
+    if paragraph:
+        yield from flush()
+
+
+# ===============================
+# MINHASH
+# ===============================
+def _shingles(text):
+    norm = re.sub(r"\s+", " ", text.casefold()).strip()
+    if len(norm) <= SHINGLE_SIZE:
+        return {norm}
+    return {norm[i:i + SHINGLE_SIZE] for i in range(len(norm) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in _shingles(text)]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+# ===============================
+# PIPELINE
+# ===============================
+def ingest(documents, max_words=MAX_CHUNK_WORDS, threshold=DUPLICATE_THRESHOLD):
+    """
+    Args:
+        documents: iterable of (source_name, content)
+
+    Returns:
+        list: (text, provenance) for every kept chunk, in source order.
+        provenance = {"source", "line", "duplicates": [{"source", "line", "similarity"}]}
+    """
+    kept = []
+    signatures = []
+    buckets = {}
+
+    for source, content in documents:
+        for text, line in chunk_text(content, max_words):
+            sig = minhash(text)
+            bands = [(b, sig[b * ROWS:(b + 1) * ROWS]) for b in range(BANDS)]
+
+            candidates = set()
+            for key in bands:
+                candidates.update(buckets.get(key, ()))
+
+            best, best_sim = None, 0.0
+            for idx in candidates:
+                sim = similarity(sig, signatures[idx])
+                if sim > best_sim:
+                    best, best_sim = idx, sim
+
+            if best is not None and best_sim >= threshold:
+                kept[best][1]["duplicates"].append(
+                    {"source": source, "line": line, "similarity": round(best_sim, 3)}
+                )
+                continue
+
+            idx = len(kept)
+            kept.append((text, {"source": source, "line": line, "duplicates": []}))
+            signatures.append(sig)
+            for key in bands:
+                buckets.setdefault(key, []).append(idx)
+
+    return kept
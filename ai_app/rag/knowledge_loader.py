@@ -1,40 +1,224 @@
+import hashlib
 import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from ai_app.rag.ingest import ingest
+from ai_app.rag.lookup import ErrorLookup
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 KNOWLEDGE_DIR = os.path.join(BASE_DIR, "knowledge")
 
+# Shared by every language partition; language-specific files live
+# in knowledge/<language>/*.txt (e.g. knowledge/hi/)
+KNOWLEDGE_FILES = [
+    "common_errors.txt",
+    "phoneme_rules.txt",
+    "therapy_tips.txt"
+]
+
+DEFAULT_LANGUAGE = "en"
+
+# Minimum seconds between two stat() checks of the knowledge files
+CHECK_INTERVAL = 1.0
+
+# Partitions unused for this long are evicted (seconds)
+PARTITION_IDLE_TTL = 15 * 60
+
+_WORD_RE = re.compile(r"\w+")
 
-def load_knowledge():
+# One retrievable unit, with its lowercase text and keyword set precomputed
+Chunk = namedtuple("Chunk", ["id", "source", "text", "lower", "keywords", "provenance"])
+
+
+# ===============================
+# IN-PROCESS CORPUS
+# ===============================
+class KnowledgeCorpus:
     """
-    Load therapy & pronunciation knowledge as clean text chunks.
-    Each paragraph / bullet becomes one retrievable unit.
+    Knowledge chunks of one language, loaded once per process.
+    Files are re-read only when their mtime / size changes, and the
+    chunks are rebuilt only when the content hash actually differs.
+    `derived` holds per-partition indexes (BM25, vectors); it is reset
+    whenever the chunks change.
     """
 
-    texts = []
+    def __init__(self, language=DEFAULT_LANGUAGE, knowledge_dir=KNOWLEDGE_DIR, files=None):
+        self.language = language
+        self.knowledge_dir = knowledge_dir
+        self.shared_files = list(files or KNOWLEDGE_FILES)
+        self.files = self._discover()
+        self.chunks = []
+        self.lookup = ErrorLookup([])
+        self.derived = {}
+        self.version = 0
+
+        self._stat_signature = None
+        self._content_hash = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _discover(self):
+        files = list(self.shared_files)
+        lang_dir = os.path.join(self.knowledge_dir, self.language)
+        if os.path.isdir(lang_dir):
+            files.extend(
+                os.path.join(self.language, name)
+                for name in sorted(os.listdir(lang_dir))
+                if name.endswith(".txt")
+            )
+        return files
 
-    files = [
-        "common_errors.txt",
-        "phoneme_rules.txt",
-        "therapy_tips.txt"
-    ]
+    def _stat(self):
+        self.files = self._discover()
+        signature = []
+        for fname in self.files:
+            try:
+                st = os.stat(os.path.join(self.knowledge_dir, fname))
+                signature.append((fname, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append((fname, None, None))
+        return tuple(signature)
 
-    for fname in files:
-        path = os.path.join(KNOWLEDGE_DIR, fname)
+    def _load(self):
+        contents = []
+        for fname in self.files:
+            path = os.path.join(self.knowledge_dir, fname)
 
-        if not os.path.exists(path):
-            print(f"[RAG] Warning: Knowledge file missing -> {fname}")
-            continue
+            if not os.path.exists(path):
+                print(f"[RAG] Warning: Knowledge file missing -> {fname}")
+                continue
 
-        with open(path, encoding="utf-8") as f:
-            content = f.read().strip()
+            with open(path, encoding="utf-8") as f:
+                contents.append((fname, f.read()))
 
-            # Split into meaningful chunks (paragraph-based)
-            chunks = [
-                chunk.strip()
-                for chunk in content.split("\n\n")
-                if chunk.strip()
-            ]
+        digest = hashlib.sha1()
+        for fname, content in contents:
+            digest.update(fname.encode("utf-8"))
+            digest.update(content.encode("utf-8"))
+        content_hash = digest.hexdigest()
 
-            texts.extend(chunks)
+        if content_hash == self._content_hash:
+            return
 
-    return texts
+        # Size-bounded chunks, near-duplicates dropped (see ingest.py)
+        chunks = []
+        for text, provenance in ingest(contents):
+            lower = text.lower()
+            chunks.append(Chunk(
+                id=len(chunks),
+                source=provenance["source"],
+                text=text,
+                lower=lower,
+                keywords=frozenset(_WORD_RE.findall(lower)),
+                provenance=provenance
+            ))
+
+        # Swap in new objects: readers holding the old ones stay consistent
+        self.lookup = ErrorLookup(chunks)
+        self.derived = {}
+        self.chunks = chunks
+        self._content_hash = content_hash
+        self.version += 1
+
+    def refresh(self, force=False):
+        """Reload if the knowledge files changed on disk."""
+        now = time.monotonic()
+        if not force and self._stat_signature is not None and now - self._last_check < CHECK_INTERVAL:
+            return self
+
+        with self._lock:
+            self._last_check = now
+            signature = self._stat()
+            if force or signature != self._stat_signature:
+                self._load()
+                self._stat_signature = signature
+
+        return self
+
+    @property
+    def texts(self):
+        return [c.text for c in self.chunks]
+
+    @property
+    def content_hash(self):
+        """SHA-1 of the loaded knowledge files; stable across processes."""
+        return self._content_hash
+
+
+# ===============================
+# LANGUAGE PARTITIONS
+# ===============================
+class KnowledgePartitions:
+    """
+    One KnowledgeCorpus per language, loaded on first request and
+    evicted (with its derived indexes) after PARTITION_IDLE_TTL.
+    """
+
+    def __init__(self, idle_ttl=PARTITION_IDLE_TTL):
+        self.idle_ttl = idle_ttl
+        self._partitions = {}
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._evict_hooks = []
+
+    def on_evict(self, hook):
+        """Register hook(language), called after a partition is evicted."""
+        self._evict_hooks.append(hook)
+
+    def get(self, language=DEFAULT_LANGUAGE):
+        now = time.monotonic()
+        corpus = self._partitions.get(language)
+
+        if corpus is None:
+            with self._lock:
+                corpus = self._partitions.get(language)
+                if corpus is None:
+                    corpus = KnowledgeCorpus(language)
+                    self._partitions[language] = corpus
+
+        self._last_used[language] = now
+        if now - self._last_sweep > min(self.idle_ttl, 60):
+            self.evict_idle(now)
+
+        return corpus.refresh()
+
+    def evict_idle(self, now=None):
+        now = now if now is not None else time.monotonic()
+        evicted = []
+
+        with self._lock:
+            self._last_sweep = now
+            for language, last_used in list(self._last_used.items()):
+                if now - last_used > self.idle_ttl:
+                    self._partitions.pop(language, None)
+                    self._last_used.pop(language, None)
+                    evicted.append(language)
+
+        for language in evicted:
+            for hook in self._evict_hooks:
+                hook(language)
+        return evicted
+
+    def loaded(self):
+        return list(self._partitions)
+
+
+partitions = KnowledgePartitions()
+
+
+def get_corpus(language=DEFAULT_LANGUAGE):
+    """Knowledge corpus of a language partition (loaded on first use)."""
+    return partitions.get(language or DEFAULT_LANGUAGE)
+
+
+def load_knowledge(language=DEFAULT_LANGUAGE):
+    """
+    Load therapy & pronunciation knowledge as clean text chunks.
+    Each paragraph (split further when long) becomes one retrievable unit.
+    Served from the cached corpus; files are only re-read on change.
+    """
+    return get_corpus(language).texts
@@ -0,0 +1,168 @@
+"""
+Error-keyed knowledge lookup.
+Maps phoneme symbols and error categories to ranked knowledge chunk
+ids, precomputed when the corpus loads, so retrieval is a handful of
+dictionary lookups per submission instead of a scan over all chunks.
+Only the best CUE_TOP_N chunks are kept per cue, so a lookup costs
+O(cues x CUE_TOP_N) however common a cue word is.
+"""
+
+import threading
+
+# Chunk ids kept per cue (votes beyond this rank are negligible anyway)
+CUE_TOP_N = 8
+
+# ===============================
+# CUE TABLES
+# ===============================
+# A cue is a keyword (matched against a chunk's keyword set) or, if it
+# contains a space, a phrase (matched against the lowercased text).
+
+CATEGORY_CUES = {
+    "missing_phonemes": ["phoneme", "sound", "sounds", "isolation"],
+    "extra_phonemes": ["distinguish", "minimal pairs", "exaggerate"],
+    "missing_words": ["skip", "syllable", "syllables", "break", "slowly"],
+    "extra_words": ["listen", "record", "replay"],
+    "band_low": ["slowly", "isolation", "practice"],
+    "band_moderate": ["repeat", "practice"],
+    "band_high": ["refine", "practice"]
+}
+
+# Articulatory features shared across languages, keyed on IPA marks
+FEATURE_CUES = {
+    "aspirated": ["aspirated", "airflow", "burst"],
+    "long": ["long vowels", "held", "prolonged"],
+    "retroflex": ["retroflex", "curl"],
+    "dental": ["dental", "teeth"],
+    "nasal": ["nasal", "nose"]
+}
+
+_RETROFLEX = {"ʈ", "ɖ", "ɳ", "ɽ", "ʂ", "ɭ", "ɻ"}
+_NASAL = {"m", "n", "ɳ", "ŋ", "ɲ"}
+
+# Per-language phoneme -> cues. Add a language with register_phoneme_table().
+PHONEME_TABLES = {
+    "en": {
+        "θ": ["th", "teeth"],
+        "ð": ["th", "teeth", "voiced"],
+        "ʃ": ["sh"],
+        "tʃ": ["ch"],
+        "əl": ["ending consonants"],
+        "ər": ["ending consonants"]
+    },
+    "hi": {
+        "ʈ": ["ट"],
+        "ɖ": ["ड"],
+        "t̪": ["त"],
+        "d̪": ["द"],
+        "kʰ": ["ख"],
+        "gʱ": ["घ"],
+        "bʱ": ["भ"],
+        "m": ["म"],
+        "n": ["न"]
+    },
+    "ta": {
+        "ʈ": ["tamil"],
+        "ɳ": ["tamil"],
+        "ɻ": ["tamil"]
+    }
+}
+
+_tables_lock = threading.Lock()
+
+
+def register_phoneme_table(language, table):
+    """Add / extend the phoneme -> cues table of a language."""
+    with _tables_lock:
+        PHONEME_TABLES.setdefault(language, {}).update(table)
+
+
+def phoneme_features(symbol):
+    features = []
+    if "ʰ" in symbol or "ʱ" in symbol:
+        features.append("aspirated")
+    if "ː" in symbol:
+        features.append("long")
+    if symbol[:1] in _RETROFLEX:
+        features.append("retroflex")
+    if "\u032a" in symbol:  # combining bridge below (t̪, d̪)
+        features.append("dental")
+    if symbol in _NASAL:
+        features.append("nasal")
+    return features
+
+
+# ===============================
+# LOOKUP
+# ===============================
+class ErrorLookup:
+    """
+    cue -> top CUE_TOP_N ranked chunk ids, for every cue in the tables above.
+    Cues first seen at query time (e.g. a newly registered language)
+    are resolved once and memoized.
+    """
+
+    def __init__(self, chunks, top_n=CUE_TOP_N):
+        self.chunks = chunks
+        self.top_n = top_n
+        self._cue_index = {}
+        self._lock = threading.Lock()
+
+        cues = set()
+        for values in CATEGORY_CUES.values():
+            cues.update(values)
+        for values in FEATURE_CUES.values():
+            cues.update(values)
+        for table in PHONEME_TABLES.values():
+            for values in table.values():
+                cues.update(values)
+
+        for cue in cues:
+            self._cue_index[cue] = self._resolve(cue)
+
+    def _resolve(self, cue):
+        if " " in cue:
+            hits = [(c.lower.count(cue), c.id) for c in self.chunks if cue in c.lower]
+        else:
+            hits = [(1, c.id) for c in self.chunks if cue in c.keywords]
+        hits.sort(key=lambda h: (-h[0], h[1]))
+        return tuple(chunk_id for _, chunk_id in hits[:self.top_n])
+
+    def cue(self, cue):
+        ids = self._cue_index.get(cue)
+        if ids is None:
+            with self._lock:
+                ids = self._cue_index.setdefault(cue, self._resolve(cue))
+        return ids
+
+    def _cues_for_phoneme(self, symbol, language):
+        table = PHONEME_TABLES.get(language, {})
+        cues = list(table.get(symbol, ()))
+        for feature in phoneme_features(symbol):
+            cues.extend(FEATURE_CUES[feature])
+        return cues
+
+    def lookup(self, profile, language="en", limit=1):
+        """
+        Ranked chunk ids for an error profile.
+        Each cue contributes reciprocal-rank votes; phoneme cues count
+        double because they are the most specific signal.
+        """
+        votes = {}
+
+        def vote(cues, weight):
+            for cue in cues:
+                for rank, chunk_id in enumerate(self.cue(cue)):
+                    votes[chunk_id] = votes.get(chunk_id, 0.0) + weight / (rank + 1)
+
+        for symbol in profile["missing_phonemes"] + profile["extra_phonemes"]:
+            vote(self._cues_for_phoneme(symbol, language), 2.0)
+
+        for category in ("missing_phonemes", "extra_phonemes", "missing_words", "extra_words"):
+            if profile[category]:
+                vote(CATEGORY_CUES[category], 1.0)
+
+        vote(CATEGORY_CUES["band_" + profile["band"]], 1.0)
+
+        ranked = sorted(votes.items(), key=lambda v: (-v[1], v[0]))
+        return [chunk_id for chunk_id, _ in ranked[:limit]]
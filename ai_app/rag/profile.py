@@ -0,0 +1,58 @@
+from ai_app.core.scoring import combine_scores
+from ai_app.core.languages import LANGUAGE_CODES, normalize_language
+
+
+# ===============================
+# ERROR PROFILE
+# ===============================
+def score_band(score):
+    if score < 60:
+        return "low"
+    elif score < 80:
+        return "moderate"
+    return "high"
+
+
+def extract_profile(assessment_result):
+    """
+    Pull the fields retrieval depends on out of an assessment result,
+    tolerating missing keys (older submissions, partial results).
+    """
+    word_score = assessment_result.get("word_score", 0)
+    phoneme_score = assessment_result.get("phoneme_score")
+
+    score = assessment_result.get(
+        "score",
+        combine_scores(word_score, phoneme_score)
+    )
+
+    errors = assessment_result.get("errors") or {}
+    text_errors = errors.get("text") or {}
+    phoneme_errors = errors.get("phonemes") or {}
+
+    return {
+        "score": score,
+        "band": score_band(score),
+        "language": normalize_language(assessment_result.get("language")),
+        "missing_words": list(text_errors.get("missing_words", [])),
+        "extra_words": list(text_errors.get("extra_words", [])),
+        "missing_phonemes": list(phoneme_errors.get("missing_phonemes", [])),
+        "extra_phonemes": list(phoneme_errors.get("extra_phonemes", []))
+    }
+
+
+def build_query(profile):
+    """Natural-language retrieval query describing the detected errors."""
+    parts = []
+
+    if profile["missing_phonemes"]:
+        parts.append("missing phoneme sounds " + " ".join(profile["missing_phonemes"]))
+    if profile["extra_phonemes"]:
+        parts.append("distorted phoneme sounds " + " ".join(profile["extra_phonemes"]))
+    if profile["missing_words"]:
+        parts.append("skipped or unclear words " + " ".join(profile["missing_words"]))
+    if profile["extra_words"]:
+        parts.append("mispronounced words " + " ".join(profile["extra_words"]))
+
+    parts.append(f"{profile['band']} pronunciation accuracy practice guidance")
+    return ". ".join(parts)
@@ -0,0 +1,161 @@
+"""
+Response cache for rag_chatbot.
+Replies are assembled deterministically from the question intent,
+the assessment fields and the retrieved knowledge, so they are cached
+under a fingerprint of exactly those inputs. Optionally persisted to
+disk so warm entries survive worker restarts: new entries are appended
+as JSON Lines (workers sharing the file merge instead of overwriting
+each other) and the file is compacted once it holds
+COMPACT_FACTOR x RESPONSE_CACHE_SIZE lines.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from ai_app.core.lru import LRUMemo
+from ai_app.utils.storage import atomic_write, file_lock, repair_tail
+
+RESPONSE_CACHE_SIZE = 2048
+COMPACT_FACTOR = 2
+
+# Set to a file path to persist the cache between processes
+RESPONSE_CACHE_FILE = os.environ.get("RAG_RESPONSE_CACHE")
+
+
+def fingerprint(intent, assessment_result, profile_key, knowledge_state, retriever):
+    """
+    Stable hash of every input the reply depends on.
+    `knowledge_state` must be stable across processes (content hash of
+    the corpus plus the index identity), since entries are persisted.
+    """
+    payload = [
+        intent,
+        assessment_result.get("score"),
+        assessment_result.get("word_score", 0),
+        assessment_result.get("phoneme_score"),
+        assessment_result.get("explanation", "No explanation available."),
+        list(profile_key),
+        knowledge_state,
+        retriever
+    ]
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """LRU of fingerprint -> reply, with optional append-only persistence."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, path=None):
+        self.memo = LRUMemo(max_entries)
+        self.path = path
+        self._pending = []      # (key, reply) not yet on disk
+        self._lines = 0         # lines in the file (compaction trigger)
+        self._rewrite = False   # file must be rewritten (old format / cleared)
+        self._cleared = False   # drop what is on disk instead of merging it
+        self._io_lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def get(self, key):
+        return self.memo.get(key)
+
+    def put(self, key, reply):
+        self.memo.put(key, reply)
+        with self._io_lock:
+            self._pending.append((key, reply))
+
+    def stats(self):
+        return self.memo.stats()
+
+    def clear(self):
+        self.memo.clear()
+        with self._io_lock:
+            self._pending = []
+            self._rewrite = self._cleared = True
+
+    # -------------------------------
+    # PERSISTENCE
+    # -------------------------------
+    def _read(self):
+        """(entries oldest first, line count, legacy format?) of the file."""
+        with open(self.path, encoding="utf-8") as f:
+            text = f.read()
+
+        # Older versions wrote one JSON array of [key, reply] pairs
+        head = text.lstrip()
+        if head.startswith("[[") or head.rstrip() == "[]":
+            return json.loads(text), 0, True
+
+        entries, lines = [], 0
+        for line in text.splitlines(keepends=True):
+            if not line.endswith("\n"):
+                break  # torn by a crash mid-append
+            lines += 1
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries, lines, False
+
+    def load(self):
+        try:
+            entries, lines, legacy = self._read()
+        except (OSError, ValueError) as e:
+            print(f"[RAG] Warning: response cache not loaded -> {e}")
+            return
+
+        # Stored oldest first, so re-inserting keeps the LRU order
+        for key, reply in entries:
+            self.memo.put(key, reply)
+        self._lines = lines
+        self._rewrite = self._rewrite or legacy
+
+    def persist(self):
+        """
+        Append entries added since the last call (no-op without a path);
+        compacts the file when it has grown well past the LRU size.
+        """
+        if not self.path:
+            return
+
+        with self._io_lock:
+            pending, self._pending = self._pending, []
+            if not pending and not self._rewrite:
+                return
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with file_lock(self.path):
+                if self._rewrite or self._lines + len(pending) > COMPACT_FACTOR * self.memo.max_entries:
+                    self._compact()
+                    return
+
+                repair_tail(self.path)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(_encode(key, reply) for key, reply in pending)
+                self._lines += len(pending)
+
+    def _compact(self):
+        """Merge other workers' entries, then rewrite the file (under the lock)."""
+        if not self._cleared and os.path.exists(self.path):
+            try:
+                entries, _, _ = self._read()
+            except (OSError, ValueError):
+                entries = []
+            for key, reply in entries:
+                if self.memo.get(key) is None:
+                    self.memo.put(key, reply)
+
+        items = self.memo.items()
+        atomic_write(self.path, "".join(_encode(key, reply) for key, reply in items))
+        self._lines = len(items)
+        self._rewrite = self._cleared = False
+
+
+def _encode(key, reply):
+    return json.dumps([key, reply], ensure_ascii=False) + "\n"
+
+
+response_cache = ResponseCache(path=RESPONSE_CACHE_FILE)
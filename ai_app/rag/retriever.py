@@ -1,78 +1,49 @@
-from ai_app.rag.knowledge_loader import load_knowledge
+from ai_app.rag.knowledge_loader import get_corpus, DEFAULT_LANGUAGE
+from ai_app.rag.profile import extract_profile, build_query
+from ai_app.rag.vector_index import get_vector_retriever
+from ai_app.rag.bm25 import get_bm25_retriever
 
+MAX_CONTEXT_ITEMS = 4
+MAX_THERAPY_POINTS = 1  # 👈 control output size
 
-def retrieve_context(assessment_result):
-    """
-    Retrieve targeted therapy & pronunciation knowledge
-    based on detected errors.
-    """
-
-    # ===============================
-    # SAFE SCORE HANDLING
-    # ===============================
-    word_score = assessment_result.get("word_score", 0)
-    phoneme_score = assessment_result.get("phoneme_score")
-
-    score = assessment_result.get(
-        "score",
-        round(
-            0.6 * word_score +
-            0.4 * (phoneme_score if phoneme_score is not None else 0),
-            2
-        )
-    )
-
-    # ===============================
-    # SAFE ERROR EXTRACTION
-    # ===============================
-    errors = assessment_result.get("errors", {})
-
-    text_errors = errors.get("text", {})
-    phoneme_errors = errors.get("phonemes", {})
 
-    missing_words = text_errors.get("missing_words", [])
-    extra_words = text_errors.get("extra_words", [])
-
-    missing_phonemes = phoneme_errors.get("missing_phonemes", [])
-    extra_phonemes = phoneme_errors.get("extra_phonemes", [])
-
-    knowledge = load_knowledge()
+def _feedback_items(profile):
     selected = []
 
     # -------------------------------
     # WORD-LEVEL FEEDBACK
     # -------------------------------
-    if missing_words:
+    if profile["missing_words"]:
         selected.append(
-            f"Missing or unclear words: {', '.join(missing_words)}."
+            f"Missing or unclear words: {', '.join(profile['missing_words'])}."
         )
 
-    if extra_words:
+    if profile["extra_words"]:
         selected.append(
-            f"Extra or mispronounced words: {', '.join(extra_words)}."
+            f"Extra or mispronounced words: {', '.join(profile['extra_words'])}."
         )
 
     # -------------------------------
     # PHONEME-LEVEL FEEDBACK
     # -------------------------------
-    if missing_phonemes:
+    if profile["missing_phonemes"]:
         selected.append(
-            f"Missing phoneme sounds: {', '.join(missing_phonemes)}."
+            f"Missing phoneme sounds: {', '.join(profile['missing_phonemes'])}."
         )
 
-    if extra_phonemes:
+    if profile["extra_phonemes"]:
         selected.append(
-            f"Extra or distorted phoneme sounds: {', '.join(extra_phonemes)}."
+            f"Extra or distorted phoneme sounds: {', '.join(profile['extra_phonemes'])}."
         )
 
     # -------------------------------
     # SEVERITY-BASED GUIDANCE
     # -------------------------------
-    if score < 60:
+    if profile["band"] == "low":
         selected.append(
             "Pronunciation accuracy is low. Focus on slow, isolated word practice."
         )
-    elif score < 80:
+    elif profile["band"] == "moderate":
         selected.append(
             "Moderate pronunciation issues detected. Controlled repetition is advised."
         )
@@ -81,25 +52,100 @@ def retrieve_context(assessment_result):
             "Pronunciation is mostly correct. Minor articulation refinement needed."
         )
 
-    # -------------------------------
-    # THERAPY KNOWLEDGE (LIMITED & RELEVANT)
-    # -------------------------------
-    therapy_count = 0
-    MAX_THERAPY_POINTS = 1  # 👈 control output size
+    return selected
+
+
+def _lookup_knowledge(profile, limit=MAX_THERAPY_POINTS):
+    """Error-keyed table lookups over the language's corpus (no index required)."""
+    corpus = get_corpus(profile["language"])
+    chunk_ids = corpus.lookup.lookup(profile, profile["language"], limit)
+    return [corpus.chunks[i].text for i in chunk_ids]
+
+
+def get_retriever(kind="auto", language=DEFAULT_LANGUAGE):
+    """
+    Resolve a retriever backend for a language partition:
+    - "vector": FAISS index (None if unavailable)
+    - "bm25": lexical index, no model required
+    - "lookup": error-keyed lookup table (returns None)
+    - "auto": vector when available, else the lookup table
+    """
+    if kind == "bm25":
+        return get_bm25_retriever(language)
+    if kind in ("vector", "auto"):
+        return get_vector_retriever(language)
+    return None
+
+
+def profile_key(profile):
+    """Hashable key: results with equal keys retrieve identical context."""
+    return (
+        profile["band"],
+        profile["language"],
+        tuple(profile["missing_words"]),
+        tuple(profile["extra_words"]),
+        tuple(profile["missing_phonemes"]),
+        tuple(profile["extra_phonemes"])
+    )
+
+
+def _knowledge_for(profiles, retriever):
+    """
+    Therapy knowledge for each profile: one search call per language
+    partition in the batch, each against that language's index.
+    """
+    by_language = {}
+    for i, profile in enumerate(profiles):
+        by_language.setdefault(profile["language"], []).append(i)
+
+    out = [None] * len(profiles)
+    for language, members in by_language.items():
+        backend = get_retriever(retriever, language)
+        if backend is None:
+            for i in members:
+                out[i] = _lookup_knowledge(profiles[i])
+            continue
+
+        hits = backend.search_batch(
+            [build_query(profiles[i]) for i in members], k=MAX_THERAPY_POINTS
+        )
+        for i, h in zip(members, hits):
+            out[i] = [text for _, _, text in h]
+
+    return out
+
+
+def retrieve_context(assessment_result, retriever="auto"):
+    """
+    Retrieve targeted therapy & pronunciation knowledge
+    based on detected errors.
+    """
+    return retrieve_context_batch([assessment_result], retriever)[0]
+
+
+def retrieve_context_batch(assessment_results, retriever="auto"):
+    """
+    retrieve_context() for many results at once.
+    Results with the same error profile share one retrieval, and all
+    queries go to the backend in a single batch (one embedding pass
+    for the vector index). Output is aligned with the input order.
+    """
+    profiles = [extract_profile(r) for r in assessment_results]
 
-    for chunk in knowledge:
-        chunk_l = chunk.lower()
+    groups = {}
+    for i, profile in enumerate(profiles):
+        groups.setdefault(profile_key(profile), []).append(i)
 
-        # Pick only highly relevant guidance
-        if (
-            ("phoneme" in chunk_l and missing_phonemes) or
-            ("practice" in chunk_l) or
-            ("skip" in chunk_l)
-        ):
-            selected.append(chunk)
-            therapy_count += 1
+    representatives = [profiles[members[0]] for members in groups.values()]
+    knowledge = _knowledge_for(representatives, retriever)
 
-        if therapy_count >= MAX_THERAPY_POINTS:
-            break
+    out = [None] * len(profiles)
+    for profile, members, extra in zip(representatives, groups.values(), knowledge):
+        # -------------------------------
+        # THERAPY KNOWLEDGE (LIMITED & RELEVANT)
+        # -------------------------------
+        selected = (_feedback_items(profile) + extra)[:MAX_CONTEXT_ITEMS]
+        for i in members:
+            out[i] = list(selected)
 
-    return selected[:4]
+    return out
@@ -0,0 +1,345 @@
+"""
+Persistent FAISS vector index over the knowledge corpus.
+Built offline per language partition
+(python -m ai_app.rag.vector_index build [--language hi] [--quant sq8|ivfpq]),
+saved to disk and opened read-only with IO_FLAG_MMAP. FAISS only maps the
+inverted lists of IVF layouts ("ivfpq"), so only those share pages between
+worker processes; "flat" and "sq8" codes are read into each process's
+memory. faiss / sentence-transformers are optional:
+without them (or without a built index) retrieval falls back to the
+keyword path in retriever.py.
+"""
+
+import json
+import os
+import threading
+import time
+
+try:
+    import numpy as np
+    import faiss
+    FAISS_AVAILABLE = True
+except Exception:
+    FAISS_AVAILABLE = False
+
+from ai_app.rag.knowledge_loader import BASE_DIR, DEFAULT_LANGUAGE, get_corpus, partitions
+
+INDEX_DIR = os.path.join(BASE_DIR, "index")
+INDEX_FILE = "knowledge.faiss"
+META_FILE = "chunks.json"
+
+# Multilingual so Hindi / Tamil guidance embeds in the same space
+EMBED_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+DEFAULT_TOP_K = 4
+
+# Index compression: "flat" (exact float32), "sq8" (int8 scalar
+# quantization, 4x smaller) or "ivfpq" (inverted lists + product
+# quantization, for large multilingual corpora)
+QUANTIZATIONS = ("flat", "sq8", "ivfpq")
+PQ_BITS = 8
+PQ_SUBVECTOR_DIM = 8
+DEFAULT_NPROBE = 16
+
+# Minimum seconds between two stat() checks of a served index file
+RELOAD_CHECK_INTERVAL = 1.0
+
+
+def index_dir_for(language=DEFAULT_LANGUAGE):
+    """Indexes are partitioned by language: ai_app/rag/index/<language>/."""
+    return os.path.join(INDEX_DIR, language)
+
+
+def index_identity(language=DEFAULT_LANGUAGE):
+    """
+    (mtime_ns, size) of a partition's index file, or None if there is
+    none. Changes whenever the index is rebuilt or republished, in any
+    process.
+    """
+    try:
+        st = os.stat(os.path.join(index_dir_for(language), INDEX_FILE))
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+# ===============================
+# ENCODER (LOADED ONCE)
+# ===============================
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder(model_name=EMBED_MODEL):
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                from sentence_transformers import SentenceTransformer
+                _encoder = SentenceTransformer(model_name)
+    return _encoder
+
+
+def embed(texts, model_name=EMBED_MODEL):
+    """Unit-normalized float32 embeddings (inner product == cosine)."""
+    vectors = get_encoder(model_name).encode(
+        list(texts),
+        batch_size=64,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False
+    )
+    return np.ascontiguousarray(vectors, dtype="float32")
+
+
+# ===============================
+# BUILD (OFFLINE)
+# ===============================
+def make_index(vectors, quantization="flat"):
+    """
+    Create and train an inner-product index for `vectors`.
+    IVF-PQ needs enough points to train its codebooks; smaller corpora
+    fall back to sq8 so the build never fails on a tiny knowledge base.
+
+    Returns:
+        tuple: (index, quantization actually used)
+    """
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization}")
+
+    n, dim = vectors.shape
+
+    if quantization == "ivfpq":
+        nlist = max(1, min(int(4 * n ** 0.5), n // 39))
+        m = dim // PQ_SUBVECTOR_DIM if dim % PQ_SUBVECTOR_DIM == 0 else 1
+        if n < max(2 ** PQ_BITS, 39 * nlist):
+            print(f"[RAG] Warning: {n} chunks too few for IVF-PQ, using sq8")
+            quantization = "sq8"
+        else:
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, m, PQ_BITS, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index.nprobe = min(DEFAULT_NPROBE, nlist)
+            return index, quantization
+
+    if quantization == "sq8":
+        index = faiss.IndexScalarQuantizer(
+            dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(vectors)
+        return index, quantization
+
+    return faiss.IndexFlatIP(dim), quantization
+
+
+def build_index(language=DEFAULT_LANGUAGE, chunks=None, model_name=EMBED_MODEL, quantization="flat"):
+    """
+    Embed every knowledge chunk and write the index + chunk metadata.
+
+    Returns:
+        str: path of the written index file
+    """
+    if not FAISS_AVAILABLE:
+        raise RuntimeError("faiss-cpu and numpy are required to build the vector index")
+
+    chunks = chunks if chunks is not None else get_corpus(language).chunks
+    texts = [c.text for c in chunks]
+    index_dir = index_dir_for(language)
+
+    vectors = embed(texts, model_name)
+    index, quantization = make_index(vectors, quantization)
+    index.add(vectors)
+
+    os.makedirs(index_dir, exist_ok=True)
+    index_path = os.path.join(index_dir, INDEX_FILE)
+    faiss.write_index(index, index_path)
+
+    meta = {
+        "model": model_name,
+        "dim": int(vectors.shape[1]),
+        # What make_index actually built (ivfpq may have fallen back to sq8)
+        "quantization": quantization,
+        "chunks": [
+            {"id": c.id, "source": c.source, "text": c.text, "provenance": c.provenance}
+            for c in chunks
+        ]
+    }
+    if quantization == "ivfpq":
+        meta["nprobe"] = int(index.nprobe)
+    with open(os.path.join(index_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    return index_path
+
+
+def benchmark_recall(vectors, queries, quantization, k=10):
+    """
+    Recall@k of a compressed index against the exact flat index
+    on the same vectors, plus the serialized size of both. Rows are
+    labelled with the quantization actually built.
+    """
+    exact = faiss.IndexFlatIP(vectors.shape[1])
+    exact.add(vectors)
+
+    approx, used = make_index(vectors, quantization)
+    approx.add(vectors)
+
+    k = min(k, len(vectors))
+    _, exact_ids = exact.search(queries, k)
+    _, approx_ids = approx.search(queries, k)
+
+    hits = sum(
+        len(set(e[e >= 0]) & set(a[a >= 0]))
+        for e, a in zip(exact_ids, approx_ids)
+    )
+    return {
+        "quantization": used,
+        "requested": quantization,
+        "k": k,
+        "recall": round(hits / (len(queries) * k), 4) if k else 1.0,
+        "exact_bytes": int(faiss.serialize_index(exact).size),
+        "index_bytes": int(faiss.serialize_index(approx).size)
+    }
+
+
+# ===============================
+# QUERY
+# ===============================
+class VectorRetriever:
+    """
+    Top-k semantic retrieval over a prebuilt index.
+    search() / search_batch() return (chunk_id, score, text) tuples.
+    """
+
+    def __init__(self, index, chunks, model_name=EMBED_MODEL):
+        self.index = index
+        self.chunks = chunks
+        self.model_name = model_name
+        # FAISS ids are positions for a flat build, content-hash ids
+        # for indexes maintained by the incremental indexer
+        self._by_id = {c["id"]: c for c in chunks}
+
+    @classmethod
+    def load(cls, index_dir):
+        if not FAISS_AVAILABLE:
+            raise RuntimeError("faiss-cpu and numpy are required for vector retrieval")
+
+        with open(os.path.join(index_dir, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        # IO_FLAG_MMAP maps IVF inverted lists (shared between worker
+        # processes); flat / sq8 codes are still read into memory
+        index = faiss.read_index(
+            os.path.join(index_dir, INDEX_FILE),
+            faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        )
+        if meta.get("quantization") == "ivfpq":
+            faiss.extract_index_ivf(index).nprobe = meta.get("nprobe", DEFAULT_NPROBE)
+        return cls(index, meta["chunks"], meta.get("model", EMBED_MODEL))
+
+    def _results(self, scores, ids):
+        out = []
+        for score, idx in zip(scores, ids):
+            if idx < 0:
+                continue
+            chunk = self._by_id.get(int(idx))
+            if chunk is not None:
+                out.append((int(idx), float(score), chunk["text"]))
+        return out
+
+    def search_vectors(self, vectors, k=DEFAULT_TOP_K):
+        k = min(k, self.index.ntotal)
+        if k <= 0:
+            return [[] for _ in range(len(vectors))]
+        scores, ids = self.index.search(vectors, k)
+        return [self._results(s, i) for s, i in zip(scores, ids)]
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        return self.search_batch([query], k)[0]
+
+    def search_batch(self, queries, k=DEFAULT_TOP_K):
+        if not queries:
+            return []
+        return self.search_vectors(embed(queries, self.model_name), k)
+
+
+# Per-language live retrievers; False marks "unavailable"
+_retrievers = {}
+_identities = {}   # language -> index_identity() the retriever was loaded from
+_last_check = {}
+_retriever_lock = threading.Lock()
+
+
+def get_vector_retriever(language=DEFAULT_LANGUAGE):
+    """
+    Retriever of a language partition, or None if faiss / its index is
+    unavailable. Reloaded when the index file changes on disk (e.g.
+    republished by `python -m ai_app.rag.indexer --watch` in another
+    process), checked at most once per RELOAD_CHECK_INTERVAL.
+    """
+    now = time.monotonic()
+    retriever = _retrievers.get(language)
+    if retriever is not None and now - _last_check.get(language, 0.0) < RELOAD_CHECK_INTERVAL:
+        return retriever or None
+
+    identity = index_identity(language)
+    with _retriever_lock:
+        _last_check[language] = now
+        if language not in _retrievers or _identities.get(language) != identity:
+            _identities[language] = identity
+            if not FAISS_AVAILABLE or identity is None:
+                _retrievers[language] = False
+            else:
+                try:
+                    _retrievers[language] = VectorRetriever.load(index_dir_for(language))
+                except Exception as e:
+                    print(f"[RAG] Warning: vector index unavailable ({language}) -> {e}")
+                    _retrievers[language] = False
+
+    return _retrievers[language] or None
+
+
+def swap_vector_retriever(retriever, language=DEFAULT_LANGUAGE):
+    """
+    Atomically replace the live retriever (queries keep running).
+    Call after publishing its index file, so it is not reloaded again.
+    """
+    with _retriever_lock:
+        _retrievers[language] = retriever if retriever is not None else False
+        _identities[language] = index_identity(language)
+        _last_check[language] = time.monotonic()
+
+
+def release_vector_retriever(language):
+    """Drop a partition's retriever (reloaded lazily on next use)."""
+    with _retriever_lock:
+        _retrievers.pop(language, None)
+        _identities.pop(language, None)
+        _last_check.pop(language, None)
+
+
+# Evicting a knowledge partition also frees its vector index
+partitions.on_evict(release_vector_retriever)
+
+
+# ================================
+# CLI
+# ================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Knowledge vector index")
+    parser.add_argument("command", choices=["build", "bench"])
+    parser.add_argument("--language", default=DEFAULT_LANGUAGE)
+    parser.add_argument("--quant", choices=QUANTIZATIONS, default="flat")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        path = build_index(args.language, quantization=args.quant)
+        print("Vector index written to:", path)
+    else:
+        # Queries: every chunk embedding, i.e. recall of the index on its own corpus
+        vectors = embed([c.text for c in get_corpus(args.language).chunks])
+        for quant in QUANTIZATIONS:
+            print(benchmark_recall(vectors, vectors, quant, args.k))
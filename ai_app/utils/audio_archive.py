@@ -0,0 +1,303 @@
+"""
+Audio archival tier
+Blobs not written for ARCHIVE_AFTER_DAYS are compressed losslessly and
+packed into append-only archive segments; the hot copy is removed only
+after the archived copy has been verified. Access restores a blob
+lazily and byte-for-byte (its SHA-256 is checked against the blob
+hash), so records keep referencing the same hash forever.
+
+Codecs:
+- "flac": PCM samples as FLAC via pydub / ffmpeg (optional); the WAV
+  header and trailer are kept verbatim next to the samples
+- "zlib": whole file, stdlib only (fallback when pydub is unavailable)
+
+Run the tiering job with: python -m ai_app.utils.audio_archive [days]
+"""
+
+import io
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+from ai_app.utils import blob_store
+from ai_app.utils.storage import atomic_write, file_lock, repair_tail
+
+try:
+    from pydub import AudioSegment
+    PYDUB_AVAILABLE = True
+except Exception:
+    PYDUB_AVAILABLE = False
+
+ARCHIVE_DIR = os.path.join("audio_submissions", "archive")
+INDEX_FILE = "index.jsonl"
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".pack"
+SEGMENT_MAX_BYTES = 256 * 1024 * 1024
+
+ARCHIVE_AFTER_DAYS = 30
+
+
+# ===============================
+# CODECS
+# ===============================
+def split_wav(data):
+    """
+    (prefix, pcm, suffix, params) of a PCM WAV file, or None if it
+    isn't one. prefix / suffix are the exact bytes around the samples.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+
+    pos, fmt = 12, None
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        size = struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        body = pos + 8
+        if chunk_id == b"fmt " and size >= 16:
+            tag, channels, rate, _, _, bits = struct.unpack("<HHIIHH", data[body:body + 16])
+            fmt = (tag, channels, rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None or fmt[0] != 1 or fmt[3] % 8:
+                return None
+            end = min(body + size, len(data))
+            params = {"channels": fmt[1], "frame_rate": fmt[2], "sample_width": fmt[3] // 8}
+            return data[:body], data[body:end], data[end:], params
+        pos = body + size + (size & 1)
+    return None
+
+
+def _encode(data):
+    """(codec, meta, payload) for one blob."""
+    parts = split_wav(data) if PYDUB_AVAILABLE else None
+    if parts is not None:
+        prefix, pcm, suffix, params = parts
+        try:
+            segment = AudioSegment(data=pcm, **params)
+            out = io.BytesIO()
+            segment.export(out, format="flac")
+            flac = out.getvalue()
+            meta = dict(params, prefix=len(prefix), suffix=len(suffix))
+            return "flac", meta, prefix + suffix + flac
+        except Exception as e:
+            print(f"[ARCHIVE] Warning: FLAC encode failed, using zlib -> {e}")
+
+    return "zlib", {}, zlib.compress(data, 9)
+
+
+def _decode(codec, meta, payload):
+    if codec == "zlib":
+        return zlib.decompress(payload)
+
+    if codec == "flac":
+        if not PYDUB_AVAILABLE:
+            raise RuntimeError("pydub (and ffmpeg) are required to restore FLAC archives")
+        prefix = payload[:meta["prefix"]]
+        suffix = payload[meta["prefix"]:meta["prefix"] + meta["suffix"]]
+        flac = payload[meta["prefix"] + meta["suffix"]:]
+        segment = AudioSegment.from_file(io.BytesIO(flac), format="flac")
+        segment = segment.set_sample_width(meta["sample_width"])
+        return prefix + segment.raw_data + suffix
+
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+# ===============================
+# ARCHIVE
+# ===============================
+class AudioArchive:
+    """
+    Append-only segments plus a JSON Lines index
+    (digest -> segment, offset, length, codec). The index is cached;
+    only lines appended since the last read are parsed, and this
+    process's own appends go straight into the cache.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR, blob_root=blob_store.BLOB_DIR):
+        self.root = root
+        self.blob_root = blob_root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self._entries = {}
+        self._index_size = 0
+        self._lock = threading.Lock()
+
+    # -------- INDEX --------
+    def _refresh_index(self):
+        """Parse lines appended since the last call (all of them after a truncation)."""
+        try:
+            size = os.path.getsize(self.index_path)
+        except FileNotFoundError:
+            return self._entries
+        if size == self._index_size:
+            return self._entries
+
+        with self._lock:
+            if size < self._index_size:
+                # Repaired or replaced: start over
+                self._entries, self._index_size = {}, 0
+
+            # Updated in place: single-key reads stay safe meanwhile
+            entries = self._entries
+            with open(self.index_path, "rb") as f:
+                f.seek(self._index_size)
+                consumed = self._index_size
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break  # torn or still being written; re-read next time
+                    consumed += len(raw)
+                    try:
+                        entry = json.loads(raw)
+                    except ValueError:
+                        print("[ARCHIVE] Warning: skipping unreadable index line")
+                        continue
+                    entries[entry["digest"]] = entry
+            self._index_size = consumed
+        return entries
+
+    def entry(self, digest):
+        return self._refresh_index().get(digest)
+
+    def __contains__(self, digest):
+        return self.entry(digest) is not None
+
+    # -------- SEGMENTS --------
+    def _current_segment(self, incoming):
+        os.makedirs(self.root, exist_ok=True)
+        names = sorted(
+            n for n in os.listdir(self.root)
+            if n.startswith(SEGMENT_PREFIX) and n.endswith(SEGMENT_SUFFIX)
+        )
+        if names:
+            last = names[-1]
+            if os.path.getsize(os.path.join(self.root, last)) + incoming <= SEGMENT_MAX_BYTES:
+                return last
+            number = int(last[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1
+        else:
+            number = 1
+        return f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+    def _read_payload(self, entry):
+        with open(os.path.join(self.root, entry["segment"]), "rb") as f:
+            f.seek(entry["offset"])
+            return f.read(entry["length"])
+
+    @staticmethod
+    def _verified(digest, codec, meta, payload):
+        try:
+            return blob_store.blob_hash(_decode(codec, meta, payload)) == digest
+        except Exception:
+            return False
+
+    def _append(self, digest, data):
+        """Archive one blob; call under the index lock."""
+        codec, meta, payload = _encode(data)
+
+        # Verify before anything references the archived copy
+        if codec != "zlib" and not self._verified(digest, codec, meta, payload):
+            print(f"[ARCHIVE] Warning: {codec} round-trip mismatch for {digest}, using zlib")
+            codec, meta, payload = "zlib", {}, zlib.compress(data, 9)
+        if not self._verified(digest, codec, meta, payload):
+            raise ValueError(f"archive round-trip mismatch for {digest}")
+
+        segment = self._current_segment(len(payload))
+        path = os.path.join(self.root, segment)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+        entry = {
+            "digest": digest,
+            "segment": segment,
+            "offset": offset,
+            "length": len(payload),
+            "codec": codec,
+            "meta": meta,
+            "original_size": len(data),
+            "archived_at": time.time()
+        }
+        # A line torn by a crash would corrupt this entry too
+        repair_tail(self.index_path)
+        self._refresh_index()  # catch up on other processes' appends
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            end = f.tell()
+
+        # Keep the cache current without re-reading the index
+        with self._lock:
+            self._entries[digest] = entry
+            self._index_size = end
+        return entry
+
+    # -------- JOB --------
+    def archive_older_than(self, days=ARCHIVE_AFTER_DAYS, now=None):
+        """
+        Move hot blobs last written more than `days` ago into the
+        archive (one job at a time, across processes).
+
+        Returns:
+            dict: archived count and hot / archived byte totals
+        """
+        cutoff = (now or time.time()) - days * 86400
+        summary = {"archived": 0, "hot_bytes": 0, "archived_bytes": 0}
+
+        with file_lock(self.index_path):
+            for digest in list(blob_store.iter_blobs(root=self.blob_root)):
+                path = blob_store.blob_path(digest, root=self.blob_root)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if st.st_mtime >= cutoff:
+                    continue
+
+                entry = self.entry(digest)
+                if entry is None:
+                    with open(path, "rb") as f:
+                        entry = self._append(digest, f.read())
+
+                os.remove(path)
+                summary["archived"] += 1
+                summary["hot_bytes"] += st.st_size
+                summary["archived_bytes"] += entry["length"]
+
+        return summary
+
+    def restore(self, digest):
+        """Bring an archived blob back into the hot store; returns its path."""
+        path = blob_store.blob_path(digest, root=self.blob_root)
+        if os.path.exists(path):
+            return path
+
+        entry = self.entry(digest)
+        if entry is None:
+            raise FileNotFoundError(f"Audio blob not found: {digest}")
+
+        data = _decode(entry["codec"], entry["meta"], self._read_payload(entry))
+        if blob_store.blob_hash(data) != digest:
+            raise ValueError(f"archived audio failed verification: {digest}")
+
+        atomic_write(path, data)
+        return path
+
+
+archive = AudioArchive()
+
+
+def restore_blob(digest):
+    return archive.restore(digest)
+
+
+# ================================
+# CLI
+# ================================
+if __name__ == "__main__":
+    import sys
+
+    days = float(sys.argv[1]) if len(sys.argv) > 1 else ARCHIVE_AFTER_DAYS
+    print("[ARCHIVE]", archive.archive_older_than(days))
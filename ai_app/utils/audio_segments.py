@@ -0,0 +1,211 @@
+"""
+Packed audio segments
+Optional storage mode (AUDIO_STORAGE=packed, see blob_store.py): audio
+blobs are appended to large segment files instead of one file each.
+A fixed-width binary index maps the SHA-256 of a blob to its place:
+
+    index.bin: <32s digest><I segment><Q offset><I length>  (48 bytes each)
+
+Both the index and the segments are read through mmap, so get_view()
+returns a zero-copy memoryview and iter_blobs() streams whole segments
+sequentially (bulk re-processing at disk bandwidth).
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+from ai_app.utils.storage import file_lock, repair_tail
+
+SEGMENT_DIR = os.path.join("audio_submissions", "packed")
+INDEX_FILE = "index.bin"
+SEGMENT_MAX_BYTES = 1024 * 1024 * 1024
+
+_RECORD = struct.Struct("<32sIQI")
+
+
+def segment_name(number):
+    return f"segment-{number:06d}.seg"
+
+
+# ===============================
+# STORE
+# ===============================
+class PackedAudioStore:
+    """
+    Append-only segments plus an append-only index.
+    Appends are serialized by the index's advisory lock; readers only
+    need the in-memory index, refreshed when index.bin grows.
+    """
+
+    def __init__(self, root=SEGMENT_DIR, max_segment_bytes=SEGMENT_MAX_BYTES):
+        self.root = root
+        self.max_segment_bytes = max_segment_bytes
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self._entries = {}   # raw digest -> (segment, offset, length)
+        self._order = []     # raw digests in append order
+        self._index_size = 0
+        self._maps = {}      # segment -> mmap
+        self._lock = threading.Lock()
+
+    # -------- INDEX --------
+    def _refresh_index(self):
+        try:
+            size = os.path.getsize(self.index_path)
+        except FileNotFoundError:
+            return
+        size -= size % _RECORD.size  # ignore a torn trailing record
+        if size <= self._index_size:
+            return
+
+        with self._lock:
+            if size <= self._index_size:
+                return
+            with open(self.index_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for pos in range(self._index_size, size, _RECORD.size):
+                        digest, segment, offset, length = _RECORD.unpack_from(mm, pos)
+                        if digest not in self._entries:
+                            self._order.append(digest)
+                        self._entries[digest] = (segment, offset, length)
+            self._index_size = size
+
+    def __contains__(self, digest):
+        self._refresh_index()
+        return bytes.fromhex(digest) in self._entries
+
+    def __len__(self):
+        self._refresh_index()
+        return len(self._entries)
+
+    # -------- SEGMENTS --------
+    def _map(self, segment, needed):
+        """mmap of a segment covering at least `needed` bytes (remapped as it grows)."""
+        mm = self._maps.get(segment)
+        if mm is not None and len(mm) >= needed:
+            return mm
+
+        with self._lock:
+            mm = self._maps.get(segment)
+            if mm is None or len(mm) < needed:
+                with open(os.path.join(self.root, segment_name(segment)), "rb") as f:
+                    # Old maps stay open: views handed out earlier remain valid
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = mm
+        return mm
+
+    def _tail(self):
+        """(segment number, size) of the segment appends go to."""
+        numbers = [
+            int(name[8:14]) for name in os.listdir(self.root)
+            if name.startswith("segment-") and name.endswith(".seg")
+        ]
+        if not numbers:
+            return 1, 0
+        last = max(numbers)
+        return last, os.path.getsize(os.path.join(self.root, segment_name(last)))
+
+    # -------- API --------
+    def put(self, data):
+        """Append `data` unless already stored; returns its hex SHA-256."""
+        digest = hashlib.sha256(data).digest()
+        self._refresh_index()
+        if digest in self._entries:
+            return digest.hex()
+
+        os.makedirs(self.root, exist_ok=True)
+        with file_lock(self.index_path):
+            # Another process may have stored it meanwhile
+            self._refresh_index()
+            if digest in self._entries:
+                return digest.hex()
+
+            segment, size = self._tail()
+            if size and size + len(data) > self.max_segment_bytes:
+                segment, size = segment + 1, 0
+
+            with open(os.path.join(self.root, segment_name(segment)), "ab") as f:
+                offset = f.tell()
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Index record last: a crash before it only leaves dead bytes.
+            # Drop a record torn by an earlier crash so this one stays aligned.
+            repair_tail(self.index_path, _RECORD.size)
+            with open(self.index_path, "ab") as f:
+                f.write(_RECORD.pack(digest, segment, offset, len(data)))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._refresh_index()
+        return digest.hex()
+
+    def get_view(self, digest):
+        """Zero-copy memoryview of a stored blob."""
+        self._refresh_index()
+        entry = self._entries.get(bytes.fromhex(digest))
+        if entry is None:
+            raise FileNotFoundError(f"Audio blob not found: {digest}")
+
+        segment, offset, length = entry
+        mm = self._map(segment, offset + length)
+        return memoryview(mm)[offset:offset + length]
+
+    def iter_blobs(self):
+        """
+        Yield (hex digest, memoryview) for every blob, segment by segment
+        in file order, so a full scan is one sequential read per segment.
+        """
+        self._refresh_index()
+        entries = sorted(
+            (self._entries[d][0], self._entries[d][1], d) for d in self._order
+        )
+        for segment, offset, digest in entries:
+            length = self._entries[digest][2]
+            mm = self._map(segment, offset + length)
+            yield digest.hex(), memoryview(mm)[offset:offset + length]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_packed_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PackedAudioStore()
+    return _store
+
+
+# ================================
+# CLI
+# ================================
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from ai_app.utils import blob_store
+
+    store = get_packed_store()
+    command = sys.argv[1] if len(sys.argv) > 1 else "scan"
+
+    if command == "pack":
+        # Copy every sharded blob into the packed segments
+        count = 0
+        for digest in blob_store.iter_blobs():
+            with open(blob_store.blob_path(digest), "rb") as f:
+                store.put(f.read())
+            count += 1
+        print(f"[SEGMENTS] Packed {count} blobs ({len(store)} stored)")
+    else:
+        start, total, count = time.perf_counter(), 0, 0
+        for _, view in store.iter_blobs():
+            total += len(view)
+            count += 1
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(f"[SEGMENTS] {count} blobs, {total / 1e6:.1f} MB, {total / 1e6 / elapsed:.0f} MB/s")
@@ -0,0 +1,130 @@
+"""
+Content-addressed audio blob store
+Submissions are stored once per distinct content under their SHA-256:
+
+    audio_submissions/blobs/ab/cd/abcd1234....wav
+
+Two levels of 256-way sharding keep every directory small, identical
+uploads are deduplicated automatically, and the hash doubles as a
+cache key (e.g. for transcripts). Records reference audio by hash
+("audio_blob"), never by path. Blobs moved to the archival tier
+(audio_archive.py) are restored transparently by local_path() /
+get_blob().
+
+AUDIO_STORAGE=packed appends new blobs to large segment files instead
+(audio_segments.py); read_blob() serves either layout.
+"""
+
+import hashlib
+import os
+
+from ai_app.utils.storage import atomic_write
+
+BLOB_DIR = os.path.join("audio_submissions", "blobs")
+DEFAULT_EXT = ".wav"
+
+# "sharded" (one file per blob) or "packed" (segment files)
+AUDIO_STORAGE = os.environ.get("AUDIO_STORAGE", "sharded")
+
+
+def blob_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_path(digest, ext=DEFAULT_EXT, root=BLOB_DIR):
+    return os.path.join(root, digest[:2], digest[2:4], digest + ext)
+
+
+def has_blob(digest, ext=DEFAULT_EXT, root=BLOB_DIR):
+    return os.path.exists(blob_path(digest, ext, root))
+
+
+def put_blob(data, ext=DEFAULT_EXT, root=BLOB_DIR):
+    """
+    Store `data` (bytes) and return its hash. Storing content that is
+    already present is a no-op; concurrent writers of the same content
+    both rename complete files onto the same path, which is harmless.
+    """
+    if AUDIO_STORAGE == "packed" and ext == DEFAULT_EXT and root == BLOB_DIR:
+        from ai_app.utils.audio_segments import get_packed_store
+        return get_packed_store().put(data)
+
+    digest = blob_hash(data)
+    path = blob_path(digest, ext, root)
+    try:
+        # Re-uploaded content counts as fresh for the archival tier
+        os.utime(path)
+    except FileNotFoundError:
+        atomic_write(path, data)
+    return digest
+
+
+def local_path(digest, ext=DEFAULT_EXT, root=BLOB_DIR):
+    """Path of a readable copy, restoring it from the archive if needed."""
+    path = blob_path(digest, ext, root)
+    if os.path.exists(path) or ext != DEFAULT_EXT or root != BLOB_DIR:
+        return path
+
+    from ai_app.utils.audio_archive import restore_blob
+    return restore_blob(digest)
+
+
+def get_blob(digest, ext=DEFAULT_EXT, root=BLOB_DIR):
+    with open(local_path(digest, ext, root), "rb") as f:
+        return f.read()
+
+
+def read_blob(digest):
+    """
+    Blob content from whichever layout holds it: a zero-copy memoryview
+    for packed segments, bytes for sharded / archived blobs.
+    """
+    if AUDIO_STORAGE == "packed":
+        from ai_app.utils.audio_segments import get_packed_store
+        store = get_packed_store()
+        if digest in store:
+            return store.get_view(digest)
+    return get_blob(digest)
+
+
+def iter_blobs(ext=DEFAULT_EXT, root=BLOB_DIR):
+    """Yield every stored digest (shard by shard)."""
+    if not os.path.isdir(root):
+        return
+    for first in sorted(os.listdir(root)):
+        level1 = os.path.join(root, first)
+        if not os.path.isdir(level1):
+            continue
+        for second in sorted(os.listdir(level1)):
+            level2 = os.path.join(level1, second)
+            for name in sorted(os.listdir(level2)):
+                if name.endswith(ext) and not name.startswith("."):
+                    yield name[:-len(ext)]
+
+
+# ================================
+# CLI: import flat legacy files
+# ================================
+def import_directory(src_dir, ext=DEFAULT_EXT, root=BLOB_DIR):
+    """
+    Copy every `ext` file directly inside `src_dir` into the store.
+    Originals are left in place.
+
+    Returns:
+        dict: file name -> digest
+    """
+    imported = {}
+    for name in sorted(os.listdir(src_dir)):
+        path = os.path.join(src_dir, name)
+        if name.endswith(ext) and os.path.isfile(path):
+            with open(path, "rb") as f:
+                imported[name] = put_blob(f.read(), ext, root)
+    return imported
+
+
+if __name__ == "__main__":
+    import sys
+
+    src = sys.argv[1] if len(sys.argv) > 1 else "audio_submissions"
+    mapping = import_directory(src)
+    print(f"[BLOBS] Imported {len(mapping)} files as {len(set(mapping.values()))} blobs")
@@ -0,0 +1,252 @@
+"""
+SQLite results repository
+Normalized submissions / responses tables in WAL mode (readers never
+block the writer), indexed on student, assessment and submission time
+so dashboard queries are index lookups rather than full-file parses.
+Selected with RESULTS_BACKEND=sqlite (see results_store.py).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+RESULTS_DB = os.environ.get("RESULTS_DB", "data/results.db")
+
+# Columns promoted out of the JSON payload (the rest stays in `data`)
+SUBMISSION_COLUMNS = (
+    "submission_id", "student", "assessment_id", "assessment_topic",
+    "language", "score", "submitted_at", "scorer_version"
+)
+RESPONSE_COLUMNS = ("question_id", "word", "score")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    submission_id    TEXT PRIMARY KEY,
+    student          TEXT,
+    assessment_id    TEXT,
+    assessment_topic TEXT,
+    language         TEXT,
+    score            REAL,
+    submitted_at     TEXT,
+    scorer_version   INTEGER,
+    data             TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    submission_id TEXT NOT NULL REFERENCES submissions(submission_id) ON DELETE CASCADE,
+    position      INTEGER NOT NULL,
+    question_id   TEXT,
+    word          TEXT,
+    score         REAL,
+    data          TEXT NOT NULL,
+    PRIMARY KEY (submission_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_student ON submissions(student, submitted_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_assessment ON submissions(assessment_id, submitted_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_time ON submissions(submitted_at);
+CREATE INDEX IF NOT EXISTS idx_responses_question ON responses(question_id);
+"""
+
+# Fixed SQL text: sqlite3 keeps compiled statements per connection,
+# so each of these is prepared once and reused.
+SQL_UPSERT_SUBMISSION = (
+    "INSERT OR REPLACE INTO submissions "
+    "(submission_id, student, assessment_id, assessment_topic, language, "
+    "score, submitted_at, scorer_version, data) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+SQL_DELETE_RESPONSES = "DELETE FROM responses WHERE submission_id = ?"
+SQL_INSERT_RESPONSE = (
+    "INSERT INTO responses (submission_id, position, question_id, word, score, data) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+SQL_SELECT_RESPONSES = (
+    "SELECT submission_id, data FROM responses "
+    "WHERE submission_id IN ({}) ORDER BY submission_id, position"
+)
+SQL_AVERAGE_BY_TOPIC = (
+    "SELECT assessment_topic, AVG(score) FROM submissions GROUP BY assessment_topic"
+)
+SQL_COUNT = "SELECT COUNT(*) FROM submissions"
+
+# SQLite's default host-parameter limit is 999
+_IN_BATCH = 500
+
+
+# ===============================
+# CONNECTIONS
+# ===============================
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
+def _connect(path=None):
+    """One connection per thread (sqlite3 connections are not shared)."""
+    path = path or RESULTS_DB
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+
+    conn = conns.get(path)
+    if conn is None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        with _schema_lock:
+            if path not in _schema_ready:
+                conn.executescript(SCHEMA)
+                _schema_ready.add(path)
+        conns[path] = conn
+    return conn
+
+
+# ===============================
+# WRITE
+# ===============================
+def _submission_row(submission):
+    payload = {k: v for k, v in submission.items() if k != "responses"}
+    return (
+        submission["submission_id"],
+        submission.get("student"),
+        submission.get("assessment_id"),
+        submission.get("assessment_topic"),
+        submission.get("language"),
+        submission.get("score"),
+        submission.get("submitted_at"),
+        submission.get("scorer_version"),
+        json.dumps(payload, ensure_ascii=False)
+    )
+
+
+def _response_rows(submission):
+    sid = submission["submission_id"]
+    return [
+        (
+            sid, position, resp.get("question_id"), resp.get("word"), resp.get("score"),
+            json.dumps(resp, ensure_ascii=False)
+        )
+        for position, resp in enumerate(submission.get("responses", []))
+    ]
+
+
+def upsert_submissions(submissions, path=None):
+    """Insert or replace whole submissions (one transaction)."""
+    conn = _connect(path)
+    with conn:
+        for s in submissions:
+            if not s.get("submission_id"):
+                raise ValueError("submissions need a submission_id")
+            conn.execute(SQL_UPSERT_SUBMISSION, _submission_row(s))
+            conn.execute(SQL_DELETE_RESPONSES, (s["submission_id"],))
+            conn.executemany(SQL_INSERT_RESPONSE, _response_rows(s))
+
+
+# ===============================
+# READ
+# ===============================
+def _attach_responses(conn, rows):
+    submissions = []
+    by_id = {}
+    for sid, data in rows:
+        s = json.loads(data)
+        s["responses"] = []
+        by_id[sid] = s
+        submissions.append(s)
+
+    ids = list(by_id)
+    for start in range(0, len(ids), _IN_BATCH):
+        batch = ids[start:start + _IN_BATCH]
+        sql = SQL_SELECT_RESPONSES.format(",".join("?" * len(batch)))
+        for sid, data in conn.execute(sql, batch):
+            by_id[sid]["responses"].append(json.loads(data))
+
+    return submissions
+
+
+def query_submissions(student=None, assessment_id=None, since=None, until=None,
+                      limit=None, path=None):
+    """
+    Submissions matching every given filter, oldest first.
+    `since` / `until` are ISO timestamps (inclusive / exclusive).
+    """
+    clauses, params = [], []
+    if student is not None:
+        clauses.append("student = ?")
+        params.append(student)
+    if assessment_id is not None:
+        clauses.append("assessment_id = ?")
+        params.append(assessment_id)
+    if since is not None:
+        clauses.append("submitted_at >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("submitted_at < ?")
+        params.append(until)
+
+    sql = "SELECT submission_id, data FROM submissions"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY submitted_at, rowid"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+    conn = _connect(path)
+    return _attach_responses(conn, conn.execute(sql, params).fetchall())
+
+
+def get_submission(submission_id, path=None):
+    conn = _connect(path)
+    rows = conn.execute(
+        "SELECT submission_id, data FROM submissions WHERE submission_id = ?",
+        (submission_id,)
+    ).fetchall()
+    found = _attach_responses(conn, rows)
+    return found[0] if found else None
+
+
+def average_scores_by_topic(path=None):
+    return {topic: avg for topic, avg in _connect(path).execute(SQL_AVERAGE_BY_TOPIC)}
+
+
+def count_submissions(path=None):
+    return _connect(path).execute(SQL_COUNT).fetchone()[0]
+
+
+# ===============================
+# MIGRATION
+# ===============================
+def migrate_from_json(path=None):
+    """
+    One-shot import of the JSON results (log or legacy file).
+    Safe to re-run: submissions are upserted by submission_id.
+
+    Returns:
+        int: number of imported submissions
+    """
+    from ai_app.utils import results_store
+
+    batch, total = [], 0
+    for submission in results_store.iter_submissions(backend="jsonl"):
+        batch.append(submission)
+        if len(batch) >= 1000:
+            upsert_submissions(batch, path)
+            total += len(batch)
+            batch = []
+    if batch:
+        upsert_submissions(batch, path)
+        total += len(batch)
+    return total
+
+
+# ================================
+# CLI
+# ================================
+if __name__ == "__main__":
+    print("[RESULTS] Imported submissions:", migrate_from_json())
+    print("[RESULTS] Total in database:", count_submissions())
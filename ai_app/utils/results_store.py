@@ -1,33 +1,354 @@
 """
 Persistent storage for assessment results
+Append-only JSON Lines log: one submission record per line. Saving is
+a single appended line (group-committed: concurrent saves share one
+fsync), updates append a newer copy of the record under the same
+submission_id, and a background compaction drops superseded copies.
+
+RESULTS_BACKEND=sqlite switches every call below to the indexed
+SQLite repository in results_db.py (migrate with
+python -m ai_app.utils.results_db).
 """
 
 import json
 import os
+import tempfile
+import threading
+import uuid
 from datetime import datetime
 
-RESULTS_FILE = "data/results.json"
+from ai_app.utils.storage import GroupCommitter, atomic_write, file_lock, file_mode, repair_tail
+
+RESULTS_LOG = "data/results.jsonl"
+LEGACY_RESULTS_FILE = "data/results.json"
+RESULTS_FILE = RESULTS_LOG
+
+RESULTS_BACKEND = os.environ.get("RESULTS_BACKEND", "jsonl")
+
+# Compact once superseded copies make up this share of the log
+COMPACT_RATIO = 0.5
+COMPACT_MIN_RECORDS = 256
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+# ===============================
+# GROUP COMMIT
+# ===============================
+class _AppendLog:
+    """
+    Appends lines to the log. Concurrent appends are group-committed
+    (one write + fsync for everything queued) under the log's advisory
+    lock, which compaction also takes for its final swap.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._committer = GroupCommitter(self._write)
+
+    def append(self, lines):
+        self._committer.submit(lines)
+
+    def _write(self, batches):
+        data = "".join(line for lines in batches for line in lines).encode("utf-8")
+        with file_lock(self.path):
+            # A line torn by a crash would swallow this append
+            repair_tail(self.path)
+            # Re-opened per commit so a compacted file is picked up
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return [None] * len(batches)
+
+
+_log = _AppendLog(RESULTS_LOG)
+
+
+def _encode(record):
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+# ===============================
+# SETUP / MIGRATION
+# ===============================
+def _write_log(path, records):
+    """Atomically write `records` as a complete log."""
+    atomic_write(path, "".join(_encode(r) for r in records))
+
+
+def migrate_legacy():
+    """
+    Convert the old single-document results.json into the log.
+    Every submission gets a submission_id; the old file is kept
+    as results.json.migrated.
+
+    Returns:
+        int: number of migrated submissions (0 if nothing to do)
+    """
+    if not os.path.exists(LEGACY_RESULTS_FILE):
+        return 0
+
+    # Check, read and rename under the lock: workers start concurrently
+    with file_lock(RESULTS_LOG):
+        if not os.path.exists(LEGACY_RESULTS_FILE) or os.path.exists(RESULTS_LOG):
+            return 0
+
+        with open(LEGACY_RESULTS_FILE, "r", encoding="utf-8") as f:
+            submissions = json.load(f).get("submissions", [])
+
+        for s in submissions:
+            s.setdefault("submission_id", uuid.uuid4().hex)
+
+        _write_log(RESULTS_LOG, submissions)
+        os.replace(LEGACY_RESULTS_FILE, LEGACY_RESULTS_FILE + ".migrated")
+    return len(submissions)
 
 
 def _ensure_file():
-    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
-    if not os.path.exists(RESULTS_FILE):
-        with open(RESULTS_FILE, "w", encoding="utf-8") as f:
-            json.dump({"submissions": []}, f)
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if not _initialized:
+            os.makedirs(os.path.dirname(RESULTS_LOG), exist_ok=True)
+            migrate_legacy()
+            _initialized = True
 
 
-def load_results():
+# ===============================
+# READ (STREAMING)
+# ===============================
+def iter_records():
+    """
+    Stream every record in log order, superseded copies included.
+    A torn last line (crash mid-append) is skipped.
+    """
     _ensure_file()
-    with open(RESULTS_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    if not os.path.exists(RESULTS_LOG):
+        return
+
+    with open(RESULTS_LOG, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print("[RESULTS] Warning: skipping unreadable record")
+
+
+def _use_sqlite(backend=None):
+    return (backend or RESULTS_BACKEND) == "sqlite"
+
+
+def iter_submissions(backend=None):
+    """Latest copy of every submission, in first-saved order."""
+    if _use_sqlite(backend):
+        from ai_app.utils import results_db
+        return iter(results_db.query_submissions())
+
+    latest = {}
+    for record in iter_records():
+        key = record.get("submission_id") or id(record)
+        latest[key] = record
+    return iter(latest.values())
+
+
+def load_results():
+    return {"submissions": list(iter_submissions())}
+
+
+def query_submissions(student=None, assessment_id=None, since=None, limit=None):
+    """
+    Submissions matching every given filter, oldest first.
+    Index lookups on the SQLite backend; a streaming scan otherwise.
+    """
+    if _use_sqlite():
+        from ai_app.utils import results_db
+        return results_db.query_submissions(student, assessment_id, since, limit=limit)
 
+    out = []
+    for s in iter_submissions():
+        if student is not None and s.get("student") != student:
+            continue
+        if assessment_id is not None and s.get("assessment_id") != assessment_id:
+            continue
+        if since is not None and (s.get("submitted_at") or "") < since:
+            continue
+        out.append(s)
+    out.sort(key=lambda s: s.get("submitted_at") or "")
+    return out[:limit] if limit is not None else out
 
+
+def average_scores_by_topic():
+    if _use_sqlite():
+        from ai_app.utils import results_db
+        return results_db.average_scores_by_topic()
+
+    scores = {}
+    for s in iter_submissions():
+        scores.setdefault(s.get("assessment_topic"), []).append(s.get("score", 0))
+    return {k: sum(v) / len(v) for k, v in scores.items()}
+
+
+# ===============================
+# WRITE
+# ===============================
 def save_result(result):
+    """Append one submission; returns its submission_id."""
     _ensure_file()
-    data = load_results()
 
     result["submitted_at"] = datetime.now().isoformat()
-    data["submissions"].append(result)
+    result.setdefault("submission_id", uuid.uuid4().hex)
+
+    if _use_sqlite():
+        from ai_app.utils import results_db
+        results_db.upsert_submissions([result])
+        return result["submission_id"]
+
+    _log.append([_encode(result)])
+    return result["submission_id"]
+
+
+def update_results(submissions):
+    """
+    Persist changed submissions by appending their new state.
+    Each must carry the submission_id it was saved with.
+    """
+    _ensure_file()
+
+    lines = []
+    for s in submissions:
+        if not s.get("submission_id"):
+            raise ValueError("update_results() needs records with a submission_id")
+        lines.append(_encode(s))
+
+    if _use_sqlite():
+        from ai_app.utils import results_db
+        results_db.upsert_submissions(submissions)
+        return
+
+    if lines:
+        _log.append(lines)
+        schedule_compaction()
+
+
+def replace_results(data):
+    """Atomically replace the whole log with `data["submissions"]`."""
+    _ensure_file()
+    with file_lock(RESULTS_LOG):
+        _write_log(RESULTS_LOG, data.get("submissions", []))
+
+
+# ===============================
+# COMPACTION
+# ===============================
+def _scan(f):
+    """
+    (latest line per submission, complete lines, end of the last
+    complete line) of an open log; the carry-over starts at that end.
+    """
+    latest = {}
+    total = 0
+    offset = 0
+    for raw in f:
+        if not raw.endswith(b"\n"):
+            break
+        offset += len(raw)
+        total += 1
+        try:
+            record = json.loads(raw)
+        except json.JSONDecodeError:
+            continue
+        latest[record.get("submission_id") or total] = raw
+    return latest, total, offset
+
+
+def compact(force=False):
+    """
+    Rewrite the log keeping only the latest copy of each submission.
+    The bulk of the file is read without blocking writers; lines
+    appended meanwhile are carried over under the file lock just
+    before the atomic rename. If the log was replaced in between
+    (another worker compacted or replaced it), it is re-scanned under
+    the lock instead.
+
+    Returns:
+        dict: records before / after, or None if not worth compacting
+    """
+    _ensure_file()
+    if not os.path.exists(RESULTS_LOG):
+        return None
+
+    with open(RESULTS_LOG, "rb") as f:
+        inode = os.fstat(f.fileno()).st_ino
+        latest, total, offset = _scan(f)
+
+    superseded = total - len(latest)
+    if not force and (total < COMPACT_MIN_RECORDS or superseded < total * COMPACT_RATIO):
+        return None
+
+    directory = os.path.dirname(RESULTS_LOG)
+    fd, tmp_path = tempfile.mkstemp(prefix=".results_", suffix=".jsonl", dir=directory)
+    try:
+        os.chmod(tmp_path, file_mode(RESULTS_LOG))
+        with os.fdopen(fd, "wb") as out:
+            out.writelines(latest.values())
+
+            with file_lock(RESULTS_LOG):
+                with open(RESULTS_LOG, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    if st.st_ino != inode or st.st_size < offset:
+                        # Not the file we scanned: start over from it
+                        latest, total, offset = _scan(f)
+                        out.seek(0)
+                        out.truncate()
+                        out.writelines(latest.values())
+                    f.seek(offset)
+                    out.write(f.read())
+                out.flush()
+                os.fsync(out.fileno())
+                os.replace(tmp_path, RESULTS_LOG)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return {"before": total, "after": len(latest)}
+
+
+_compaction = None
+_compaction_lock = threading.Lock()
+
+
+def schedule_compaction():
+    """Run compact() on a background thread (one at a time)."""
+    global _compaction
+
+    def run():
+        try:
+            compact()
+        except Exception as e:
+            print(f"[RESULTS] Warning: compaction failed -> {e}")
+
+    with _compaction_lock:
+        if _compaction is None or not _compaction.is_alive():
+            _compaction = threading.Thread(target=run, name="results-compaction", daemon=True)
+            _compaction.start()
+
+
+# ================================
+# CLI
+# ================================
+if __name__ == "__main__":
+    import sys
 
-    with open(RESULTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    command = sys.argv[1] if len(sys.argv) > 1 else "compact"
+    if command == "migrate":
+        print("[RESULTS] Migrated submissions:", migrate_legacy())
+    else:
+        print("[RESULTS]", compact(force=True))
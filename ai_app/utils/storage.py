@@ -0,0 +1,293 @@
+"""
+Shared storage primitives for the file-backed stores.
+- atomic_write: temp file in the same directory + fsync + rename, so
+  readers see the old or the new file, never a truncated one
+- file_lock: advisory lock on <path>.lock, shared between threads and
+  worker processes (fcntl; thread-only where unavailable)
+- repair_tail: drop a record torn by a crash mid-append before
+  appending after it
+- GroupCommitter / JsonDocument: concurrent mutations are queued and
+  applied by one leader in a single locked read-modify-write commit
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: in-process locking only
+    FCNTL_AVAILABLE = False
+
+
+# ===============================
+# ATOMIC WRITE
+# ===============================
+# Read once: os.umask() can only be queried by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def file_mode(path):
+    """
+    Permission bits a replacement of `path` should get: those of the
+    existing file, else the default for new files (0666 & ~umask).
+    mkstemp files are 0600, and a rename would otherwise keep that.
+    """
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write(path, data):
+    """Replace `path` with `data` (str or bytes) atomically and durably."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=directory)
+    try:
+        os.chmod(tmp_path, file_mode(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    _fsync_dir(directory)
+
+
+def atomic_write_json(path, obj, indent=2):
+    atomic_write(path, json.dumps(obj, indent=indent, ensure_ascii=False))
+
+
+def _fsync_dir(directory):
+    """Persist the rename itself (no-op where directories can't be opened)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ===============================
+# ADVISORY LOCK
+# ===============================
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(path):
+    key = os.path.abspath(path)
+    with _thread_locks_guard:
+        lock = _thread_locks.get(key)
+        if lock is None:
+            lock = _thread_locks[key] = threading.RLock()
+        return lock
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """
+    Hold the advisory lock of `path` (a sibling <path>.lock file, so
+    renaming `path` never drops the lock). Shared locks only apply
+    across processes; threads of one process always serialize.
+    """
+    with _thread_lock(path):
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+# ===============================
+# APPEND-ONLY FILES
+# ===============================
+TAIL_SCAN_BYTES = 64 * 1024
+
+
+def repair_tail(path, record_size=None):
+    """
+    Truncate a torn trailing record left by a crash mid-append, so the
+    next append starts on a record boundary. Records are lines, or
+    fixed `record_size` bytes. Call under the file's lock.
+
+    Returns:
+        int: number of bytes dropped
+    """
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+    if record_size:
+        keep = size - size % record_size
+    else:
+        keep = 0
+        with open(path, "rb") as f:
+            pos = size
+            while pos > 0:
+                start = max(0, pos - TAIL_SCAN_BYTES)
+                f.seek(start)
+                block = f.read(pos - start)
+                newline = block.rfind(b"\n")
+                if newline >= 0:
+                    keep = start + newline + 1
+                    break
+                pos = start
+
+    if keep < size:
+        with open(path, "r+b") as f:
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+    return size - keep
+
+
+# ===============================
+# GROUP COMMIT
+# ===============================
+class _Pending:
+    __slots__ = ("item", "done", "result", "error")
+
+    def __init__(self, item):
+        self.item = item
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class GroupCommitter:
+    """
+    Batches items from concurrent callers into one commit(items) call.
+    The first caller to find no commit running becomes the leader and
+    commits everything queued so far; the rest wait for that commit.
+    commit(items) returns one result per item.
+    """
+
+    def __init__(self, commit):
+        self._commit = commit
+        self._cond = threading.Condition()
+        self._queue = []
+        self._busy = False
+
+    def submit(self, item):
+        entry = _Pending(item)
+
+        with self._cond:
+            self._queue.append(entry)
+
+            while not entry.done:
+                if self._busy:
+                    self._cond.wait()
+                    continue
+
+                batch, self._queue = self._queue, []
+                self._busy = True
+                self._cond.release()
+                results, error = None, None
+                try:
+                    results = self._commit([e.item for e in batch])
+                except Exception as e:
+                    error = e
+                finally:
+                    self._cond.acquire()
+                    for i, e in enumerate(batch):
+                        e.done = True
+                        e.error = error
+                        e.result = results[i] if results is not None else None
+                    self._busy = False
+                    self._cond.notify_all()
+
+        if entry.error is not None:
+            raise entry.error
+        if isinstance(entry.result, _Failed):
+            raise entry.result.error
+        return entry.result
+
+
+class _Failed:
+    """Result slot of a single item that failed inside a shared commit."""
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+# ===============================
+# JSON DOCUMENT
+# ===============================
+class JsonDocument:
+    """
+    A JSON file updated through locked, group-committed read-modify-write.
+    update(fn) runs fn(data) on the current content (mutating it in
+    place) and returns fn's result; callers racing each other are
+    applied in order within one atomic write. Each fn works on a copy,
+    so one that raises leaves no partial change behind.
+    """
+
+    def __init__(self, path, default_factory=dict, indent=2):
+        self.path = path
+        self.default_factory = default_factory
+        self.indent = indent
+        self._committer = GroupCommitter(self._commit)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return self.default_factory()
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def read(self):
+        with file_lock(self.path, shared=True):
+            return self._load()
+
+    def update(self, fn):
+        return self._committer.submit(fn)
+
+    def write(self, data):
+        """Replace the whole document (still serialized with updates)."""
+        def replace(current):
+            current.clear()
+            current.update(data)
+        self.update(replace)
+
+    def _commit(self, fns):
+        with file_lock(self.path):
+            data = self._load()
+            results = []
+            for fn in fns:
+                draft = copy.deepcopy(data)
+                try:
+                    results.append(fn(draft))
+                except Exception as e:
+                    results.append(_Failed(e))
+                else:
+                    data = draft
+            atomic_write_json(self.path, data, self.indent)
+        return results
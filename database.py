@@ -3,15 +3,43 @@ Database Module for GenAI Big Data Platform
 Handles all database operations for users and assessments
 """
 
+import copy
 import json
 import os
 import hashlib
+import sqlite3
+import threading
 from datetime import datetime
 
+from ai_app.utils.storage import file_lock, atomic_write_json
+
 # File paths
 USERS_FILE = "users.json"
+USERS_DB = "users.db"
 ASSESSMENTS_FILE = "assessments/assessments.json"
 
+# Users are stored one row per email (JSON payload) with the role
+# indexed; reads go through a process cache that is dropped whenever
+# this or another process commits a change.
+USERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    email TEXT PRIMARY KEY,
+    role  TEXT,
+    data  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
+"""
+
+# PRAGMA user_version once users.json has been imported (never re-run,
+# so deleted users stay deleted)
+USERS_MIGRATED_VERSION = 1
+
+_db = None
+_db_lock = threading.RLock()
+_cache = {}  # email -> user dict, or None for a known-missing email
+_cache_version = None
+
+
 def hash_password(password):
     """
     Hash password using SHA-256
@@ -24,31 +52,133 @@ def hash_password(password):
     """
     return hashlib.sha256(password.encode()).hexdigest()
 
-def load_users():
+def _connect():
     """
-    Load users from JSON file
+    Open the user database once per process, migrating users.json
+    into it on first use
     
     Returns:
-        dict: Dictionary of users
+        sqlite3.Connection: Shared connection (use under _db_lock)
+    """
+    global _db
+    if _db is None:
+        conn = sqlite3.connect(USERS_DB, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(USERS_SCHEMA)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < USERS_MIGRATED_VERSION:
+            # Databases filled before the marker existed were migrated already
+            if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
+                _migrate_json(conn)
+            conn.execute(f"PRAGMA user_version = {USERS_MIGRATED_VERSION}")
+        _db = conn
+    return _db
+
+def _migrate_json(conn):
+    """
+    Import users.json (if present) into a new user database
+    
+    Args:
+        conn (sqlite3.Connection): Target connection
     """
     if not os.path.exists(USERS_FILE):
-        return {}
+        return
     
     try:
-        with open(USERS_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return {}
+        # Shared lock: never import a users.json an older worker is rewriting
+        with file_lock(USERS_FILE, shared=True):
+            with open(USERS_FILE, 'r') as f:
+                users = json.load(f)
+    except (OSError, ValueError):
+        return
+    
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO users (email, role, data) VALUES (?, ?, ?)",
+            [(email, data.get('role'), json.dumps(data)) for email, data in users.items()]
+        )
+
+def _sync_cache(conn):
+    """Drop the read cache if any connection committed since it was filled"""
+    global _cache_version
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    if version != _cache_version:
+        _cache.clear()
+        _cache_version = version
+
+def _get(email):
+    """
+    Fetch one user record (cached)
+    
+    Args:
+        email (str): User's email
+        
+    Returns:
+        dict: Stored user record (do not mutate) or None
+    """
+    with _db_lock:
+        conn = _connect()
+        _sync_cache(conn)
+        if email not in _cache:
+            row = conn.execute("SELECT data FROM users WHERE email = ?", (email,)).fetchone()
+            _cache[email] = json.loads(row[0]) if row else None
+        return _cache[email]
+
+def _put(email, user):
+    """
+    Insert or replace a single user row
+    
+    Args:
+        email (str): User's email
+        user (dict): Full user record
+    """
+    with _db_lock:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO users (email, role, data) VALUES (?, ?, ?)",
+                (email, user.get('role'), json.dumps(user))
+            )
+        _cache[email] = user
+
+def load_users():
+    """
+    Load all users
+    
+    Returns:
+        dict: Dictionary of users
+    """
+    with _db_lock:
+        rows = _connect().execute("SELECT email, data FROM users ORDER BY rowid").fetchall()
+    return {email: json.loads(data) for email, data in rows}
 
 def save_users(users):
     """
-    Save users to JSON file
+    Replace all users (bulk path; single-user changes use row updates)
     
     Args:
         users (dict): Dictionary of users to save
     """
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+    with _db_lock:
+        conn = _connect()
+        with conn:
+            conn.execute("DELETE FROM users")
+            conn.executemany(
+                "INSERT INTO users (email, role, data) VALUES (?, ?, ?)",
+                [(email, data.get('role'), json.dumps(data)) for email, data in users.items()]
+            )
+        _cache.clear()
+
+def export_users_json(path=USERS_FILE):
+    """
+    Write a users.json snapshot of the database (backups / tooling),
+    atomically and under the file lock
+    
+    Args:
+        path (str): Destination file
+    """
+    users = load_users()
+    with file_lock(path):
+        atomic_write_json(path, users)
 
 def user_exists(email):
     """
@@ -60,8 +190,7 @@ def user_exists(email):
     Returns:
         bool: True if user exists
     """
-    users = load_users()
-    return email in users
+    return _get(email) is not None
 
 def register_user(username, email, password, role):
     """
@@ -76,12 +205,7 @@ def register_user(username, email, password, role):
     Returns:
         bool: True if registration successful
     """
-    users = load_users()
-    
-    if email in users:
-        return False
-    
-    users[email] = {
+    user = {
         'username': username,
         'email': email,
         'password': hash_password(password),
@@ -91,7 +215,17 @@ def register_user(username, email, password, role):
         'assessments_created': [] if role == 'teacher' else None
     }
     
-    save_users(users)
+    # INSERT OR IGNORE: two concurrent signups for one email can't both win
+    with _db_lock:
+        conn = _connect()
+        with conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO users (email, role, data) VALUES (?, ?, ?)",
+                (email, role, json.dumps(user))
+            )
+        if cur.rowcount == 0:
+            return False
+        _cache[email] = user
     return True
 
 def verify_user(email, password):
@@ -105,12 +239,12 @@ def verify_user(email, password):
     Returns:
         bool: True if credentials are valid
     """
-    users = load_users()
+    user = _get(email)
     
-    if email not in users:
+    if user is None:
         return False
     
-    return users[email]['password'] == hash_password(password)
+    return user['password'] == hash_password(password)
 
 def get_user_by_email(email):
     """
@@ -122,12 +256,12 @@ def get_user_by_email(email):
     Returns:
         dict: User data or None
     """
-    users = load_users()
+    user = _get(email)
     
-    if email not in users:
+    if user is None:
         return None
     
-    user = users[email].copy()
+    user = copy.deepcopy(user)
     # Don't return password
     user.pop('password', None)
     return user
@@ -142,12 +276,12 @@ def get_user_role(email):
     Returns:
         str: User's role or None
     """
-    users = load_users()
+    user = _get(email)
     
-    if email not in users:
+    if user is None:
         return None
     
-    return users[email].get('role')
+    return user.get('role')
 
 def update_user(email, updates):
     """
@@ -160,16 +294,18 @@ def update_user(email, updates):
     Returns:
         bool: True if update successful
     """
-    users = load_users()
-    
-    if email not in users:
-        return False
-    
-    for key, value in updates.items():
-        if key != 'password' and key != 'email':  # Don't allow direct password/email updates
-            users[email][key] = value
-    
-    save_users(users)
+    with _db_lock:
+        user = _get(email)
+        
+        if user is None:
+            return False
+        
+        user = dict(user)
+        for key, value in updates.items():
+            if key != 'password' and key != 'email':  # Don't allow direct password/email updates
+                user[key] = value
+        
+        _put(email, user)
     return True
 
 def add_assessment_to_user(email, assessment_id):
@@ -183,18 +319,17 @@ def add_assessment_to_user(email, assessment_id):
     Returns:
         bool: True if successful
     """
-    users = load_users()
-    
-    if email not in users:
-        return False
-    
-    if 'assessments_taken' not in users[email]:
-        users[email]['assessments_taken'] = []
-    
-    if assessment_id not in users[email]['assessments_taken']:
-        users[email]['assessments_taken'].append(assessment_id)
-    
-    save_users(users)
+    with _db_lock:
+        user = _get(email)
+        
+        if user is None:
+            return False
+        
+        taken = list(user.get('assessments_taken') or [])
+        if assessment_id not in taken:
+            taken.append(assessment_id)
+        
+        _put(email, {**user, 'assessments_taken': taken})
     return True
 
 def get_user_assessments(email):
@@ -207,12 +342,12 @@ def get_user_assessments(email):
     Returns:
         list: List of assessment IDs
     """
-    users = load_users()
+    user = _get(email)
     
-    if email not in users:
+    if user is None:
         return []
     
-    return users[email].get('assessments_taken', [])
+    return list(user.get('assessments_taken', []))
 
 def get_all_users():
     """
@@ -241,13 +376,15 @@ def get_users_by_role(role):
     Returns:
         dict: Dictionary of users with that role
     """
-    users = load_users()
+    with _db_lock:
+        rows = _connect().execute(
+            "SELECT email, data FROM users WHERE role = ? ORDER BY rowid", (role,)
+        ).fetchall()
     
     filtered_users = {}
-    for email, data in users.items():
-        if data.get('role') == role:
-            filtered_users[email] = data.copy()
-            filtered_users[email].pop('password', None)
+    for email, data in rows:
+        filtered_users[email] = json.loads(data)
+        filtered_users[email].pop('password', None)
     
     return filtered_users
 
@@ -261,14 +398,12 @@ def delete_user(email):
     Returns:
         bool: True if deletion successful
     """
-    users = load_users()
-    
-    if email not in users:
-        return False
-    
-    del users[email]
-    save_users(users)
-    return True
+    with _db_lock:
+        conn = _connect()
+        with conn:
+            cur = conn.execute("DELETE FROM users WHERE email = ?", (email,))
+        _cache[email] = None
+    return cur.rowcount > 0
 
 def change_password(email, old_password, new_password):
     """
@@ -282,14 +417,14 @@ def change_password(email, old_password, new_password):
     Returns:
         bool: True if password changed successfully
     """
-    users = load_users()
-    
-    if email not in users:
-        return False
-    
-    if users[email]['password'] != hash_password(old_password):
-        return False
-    
-    users[email]['password'] = hash_password(new_password)
-    save_users(users)
-    return True
\ No newline at end of file
+    with _db_lock:
+        user = _get(email)
+        
+        if user is None:
+            return False
+        
+        if user['password'] != hash_password(old_password):
+            return False
+        
+        _put(email, {**user, 'password': hash_password(new_password)})
+    return True
@@ -4,7 +4,8 @@ Includes landing page, teacher home, and student home
 """
 
 import streamlit as st
-from utils import load_assessments, navigate_to
+from utils import navigate_to
+from ai_app.assessments.catalog import list_tests, TYPE_WORD, TYPE_IMAGE, TYPE_FILLBLANK
 from styles import toggle_theme
 
 
@@ -115,9 +116,7 @@ def render_teacher_home():
     st.markdown("---")
     
     # Quick Stats
-    assessments_data = load_assessments()
-    assessments = assessments_data.get("assessments", [])
-    teacher_assessments = [a for a in assessments if a.get('created_by') == st.session_state.user_email]
+    teacher_assessments = list_tests(creator=st.session_state.username)
     
     col1, col2 = st.columns(2)
     with col1:
@@ -126,16 +125,16 @@ def render_teacher_home():
             <h3>📊 Quick Stats</h3>
             <ul>
                 <li><strong>Total Assessments:</strong> {}</li>
-                <li><strong>Q&A Assessments:</strong> {}</li>
+                <li><strong>Pronunciation Assessments:</strong> {}</li>
                 <li><strong>Image Assessments:</strong> {}</li>
                 <li><strong>Fill-in-Blank:</strong> {}</li>
             </ul>
         </div>
         """.format(
             len(teacher_assessments),
-            len([a for a in teacher_assessments if a['type'] == 'qa']),
-            len([a for a in teacher_assessments if a['type'] == 'image']),
-            len([a for a in teacher_assessments if a['type'] == 'fillblank'])
+            len([a for a in teacher_assessments if a['type'] == TYPE_WORD]),
+            len([a for a in teacher_assessments if a['type'] == TYPE_IMAGE]),
+            len([a for a in teacher_assessments if a['type'] == TYPE_FILLBLANK])
         ), unsafe_allow_html=True)
     
     with col2:
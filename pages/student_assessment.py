@@ -1,13 +1,11 @@
 """
 Student Assessment Page
-- Uses assessments.json (tests[])
+- Uses the unified assessment catalog
 - Whisper ASR
 - Stores full responses
 - Shows System Explanation after test
 """
 
-import json
-import os
 from datetime import datetime
 import streamlit as st
 from audio_recorder_streamlit import audio_recorder
@@ -16,31 +14,30 @@ from utils import navigate_to
 from config import AUDIO_SAMPLE_RATE, AUDIO_PAUSE_THRESHOLD
 
 from ai_app.utils.results_store import save_result
-from ai_app.rag.explanation import generate_explanation
+from ai_app.assessments.catalog import list_tests, TYPE_WORD
+from ai_app.utils.blob_store import put_blob
+from ai_app.core.memo import memoized_explanation
+from ai_app.core.scoring import match_score, SCORER_MATCH, MATCH_SCORER_VERSION
+from ai_app.rag.generator import get_generator
 
 
 # ================= ASR =================
 try:
     import sys
     sys.path.append("ai_app/asr")
-    from ai_app.asr.asr_engine import transcribe_audio
+    from ai_app.asr.asr_engine import transcribe_blob
     ASR_AVAILABLE = True
 except Exception:
     ASR_AVAILABLE = False
     st.warning("⚠️ Whisper ASR not available")
 
-# ================= PATHS =================
-ASSESSMENT_JSON = "ai_app/assessments/assessments.json"
-AUDIO_DIR = "audio_submissions"
-os.makedirs(AUDIO_DIR, exist_ok=True)
-
 
 # ======================================================
 # LOAD TESTS
 # ======================================================
 def load_tests():
-    with open(ASSESSMENT_JSON, "r", encoding="utf-8") as f:
-        return json.load(f)["tests"]
+    """Takeable tests: built-in and teacher-authored word tests."""
+    return [t for t in list_tests(type=TYPE_WORD) if t["questions"]]
 
 
 # ======================================================
@@ -53,6 +50,7 @@ def render_assessment_page():
     st.session_state.setdefault("selected_test", None)
     st.session_state.setdefault("current_q", 0)
     st.session_state.setdefault("responses", [])
+    st.session_state.setdefault("submission_id", None)
 
     if not st.session_state.selected_test:
         render_test_list()
@@ -74,6 +72,7 @@ def render_test_list():
             st.session_state.selected_test = t
             st.session_state.current_q = 0
             st.session_state.responses = []
+            st.session_state.submission_id = None
             st.rerun()
 
         st.divider()
@@ -112,15 +111,16 @@ def render_word_question(question, idx, test):
     )
 
     if audio and st.button("Submit Pronunciation"):
-        audio_path = save_audio(audio, idx)
-        result = process_asr(audio_path, expected_word, test["language"])
+        audio_blob = save_audio(audio)
+        result = process_asr(audio_blob, expected_word, test["language"])
 
         if not result["success"]:
             st.error(result["error"])
             return
 
         # ---------- SYSTEM EXPLANATION ----------
-        explanation = generate_explanation(
+        explanation = memoized_explanation(
+            question_id=question["question_id"],
             expected_text=expected_word,
             spoken_text=result["text"],
             word_score=result["score"],
@@ -138,7 +138,10 @@ def render_word_question(question, idx, test):
             "transcription": result["text"],
             "score": result["score"],
             "accuracy": result["accuracy"],
-            "explanation": explanation
+            "explanation": explanation,
+            "audio_blob": audio_blob,
+            "scorer": SCORER_MATCH,
+            "scorer_version": MATCH_SCORER_VERSION
         })
 
         st.session_state.current_q += 1
@@ -148,18 +151,13 @@ def render_word_question(question, idx, test):
 # ======================================================
 # ASR + SCORING
 # ======================================================
-def process_asr(audio_path, expected, language):
+def process_asr(audio_blob, expected, language):
     try:
-        res = transcribe_audio(audio_path, language)
+        res = transcribe_blob(audio_blob, language)
         spoken = res["text"].lower().strip()
         expected = expected.lower().strip()
 
-        if spoken == expected:
-            return success(spoken, 100)
-        elif expected in spoken:
-            return success(spoken, 80)
-        else:
-            return success(spoken, 40)
+        return success(spoken, match_score(expected, spoken))
 
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -177,15 +175,9 @@ def success(text, score):
 # ======================================================
 # AUDIO SAVE
 # ======================================================
-def save_audio(audio_bytes, idx):
-    user = st.session_state.get("username", "student")
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = os.path.join(AUDIO_DIR, f"{user}_q{idx}_{ts}.wav")
-
-    with open(path, "wb") as f:
-        f.write(audio_bytes)
-
-    return path
+def save_audio(audio_bytes):
+    """Store the recording by content hash; returns the hash."""
+    return put_blob(audio_bytes)
 
 
 # ======================================================
@@ -210,20 +202,39 @@ def render_test_complete(test):
         st.divider()
 
     # ================= SAVE RESULT =================
-    save_result({
-        "student": st.session_state.username,
-        "assessment_id": test["test_id"],
-        "assessment_topic": test["title"],
-        "assessment_type": "word_pronunciation",
-        "language": test["language"],
-        "score": avg_score,
-        "accuracy": avg_score,
-        "responses": st.session_state.responses,
-        "submitted_at": datetime.now().isoformat()
-    })
+    # Saved before the summary (a backend error must not lose it),
+    # once per attempt across reruns
+    if st.session_state.submission_id is None:
+        st.session_state.submission_id = save_result({
+            "student": st.session_state.username,
+            "assessment_id": test["test_id"],
+            "assessment_topic": test["title"],
+            "assessment_type": "word_pronunciation",
+            "language": test["language"],
+            "score": avg_score,
+            "accuracy": avg_score,
+            "responses": st.session_state.responses,
+            "scorer": SCORER_MATCH,
+            "scorer_version": MATCH_SCORER_VERSION,
+            "submitted_at": datetime.now().isoformat()
+        })
+
+    # ================= SOAP SUMMARY (STREAMED) =================
+    # BM25 guidance: UI workers must not load the embedding model
+    st.markdown("## 📝 Session Summary")
+    try:
+        st.write_stream(get_generator().stream_summary({
+            "score": avg_score,
+            "word_score": avg_score,
+            "language": test["language"],
+            "responses": st.session_state.responses
+        }, retriever="bm25"))
+    except Exception as e:
+        st.warning(f"⚠️ Summary unavailable right now ({e}). Your result has been saved.")
 
     if st.button("Back to Tests"):
         st.session_state.selected_test = None
         st.session_state.current_q = 0
         st.session_state.responses = []
+        st.session_state.submission_id = None
         st.rerun()
@@ -9,12 +9,11 @@ Teacher Dashboard
 
 import streamlit as st
 from datetime import datetime
-import json
 import os
 
 from utils import (
-    load_assessments,
-    save_assessments,
+    add_assessment,
+    delete_assessment,
     navigate_to,
     generate_assessment_id
 )
@@ -26,16 +25,24 @@ from config import (
 )
 
 # ================= RESULTS =================
-from ai_app.utils.results_store import load_results
+from ai_app.utils.results_store import query_submissions, average_scores_by_topic
 
 # ================= RAG =====================
-from ai_app.rag.chatbot import rag_chatbot
+from ai_app.rag.chatbot import rag_chatbot_batch
 
 # ================= XAI =====================
-from ai_app.rag.explanation import generate_explanation
+from ai_app.core.memo import memoized_explanation
 
-# ================= PATH ====================
-JSON_ASSESS_PATH = "data/assessment.json"
+# ================= SCORING =================
+from ai_app.core.artifacts import compile_question
+
+# ================= CATALOG =================
+from ai_app.assessments.catalog import (
+    BUILTIN_FILE, list_tests, load_catalog_file
+)
+
+# Built-in tests offered for import
+JSON_ASSESS_PATH = BUILTIN_FILE
 
 
 # ======================================================
@@ -98,32 +105,29 @@ def render_create_assessment():
 # ======================================================
 def load_from_json():
     if not os.path.exists(JSON_ASSESS_PATH):
-        st.error("assessment.json not found")
+        st.error("assessments.json not found")
         return
 
-    with open(JSON_ASSESS_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    tests = data.get("tests", [])
+    tests = load_catalog_file(JSON_ASSESS_PATH)
 
     for t in tests:
         st.markdown(f"### 📘 {t['title']} ({t['language']})")
 
         if st.button("Import", key=t["test_id"]):
             assessment = {
-                "id": t["test_id"],
+                "id": generate_assessment_id(),
                 "topic": t["title"],
                 "type": ASSESSMENT_TYPE_WORD_PRONUNCIATION,
                 "language": t["language"],
+                # Scoring artifacts were compiled by the catalog loader
                 "questions": t["questions"],
                 "created_by": st.session_state.username,
                 "created_at": datetime.now().isoformat(),
-                "source": "json"
+                "source": "json",
+                "imported_from": t["test_id"]
             }
 
-            data = load_assessments()
-            data["assessments"].append(assessment)
-            save_assessments(data)
+            add_assessment(assessment)
 
             st.success("Assessment imported successfully")
             st.rerun()
@@ -150,7 +154,8 @@ def render_word_pronunciation_form():
                 words.append({
                     "word": w,
                     "example": ex,
-                    "phonetic": ph
+                    "phonetic": ph,
+                    "compiled": compile_question(w, ph or None)
                 })
 
         if st.form_submit_button("Create"):
@@ -165,9 +170,7 @@ def render_word_pronunciation_form():
                 "created_at": datetime.now().isoformat()
             }
 
-            data = load_assessments()
-            data["assessments"].append(assessment)
-            save_assessments(data)
+            add_assessment(assessment)
 
             st.success("Assessment created")
             st.rerun()
@@ -195,9 +198,7 @@ def render_image_assessment_form():
                 "created_at": datetime.now().isoformat()
             }
 
-            data = load_assessments()
-            data["assessments"].append(assessment)
-            save_assessments(data)
+            add_assessment(assessment)
 
             st.success("Assessment created")
             st.rerun()
@@ -230,9 +231,7 @@ def render_fillblank_form():
                 "created_at": datetime.now().isoformat()
             }
 
-            data = load_assessments()
-            data["assessments"].append(assessment)
-            save_assessments(data)
+            add_assessment(assessment)
 
             st.success("Assessment created")
             st.rerun()
@@ -242,17 +241,17 @@ def render_fillblank_form():
 # MY ASSESSMENTS
 # ======================================================
 def render_assessment_list():
-    data = load_assessments().get("assessments", [])
-    mine = [a for a in data if a["created_by"] == st.session_state.username]
+    mine = list_tests(creator=st.session_state.username)
 
     for a in mine:
-        st.markdown(f"### 📘 {a['topic']}")
-        st.caption(a["type"])
+        st.markdown(f"### 📘 {a['title']}")
+        st.caption(f"{a['type']} | {a['language']} | {len(a['questions'])} questions")
+
+        if a["source"] != "teacher":
+            continue
 
-        if st.button("Delete", key=f"del_{a['id']}"):
-            d = load_assessments()
-            d["assessments"] = [x for x in d["assessments"] if x["id"] != a["id"]]
-            save_assessments(d)
+        if st.button("Delete", key=f"del_{a['test_id']}"):
+            delete_assessment(a["test_id"])
             st.success("Deleted")
             st.rerun()
 
@@ -263,21 +262,20 @@ def render_assessment_list():
 def render_teacher_analytics():
     st.markdown("### 📊 Student Performance")
 
-    results = load_results().get("submissions", [])
+    results = query_submissions()
     if not results:
         st.info("No student attempts yet")
         return
 
     # -------- BAR CHART --------
-    scores = {}
-    for r in results:
-        scores.setdefault(r["assessment_topic"], []).append(r["score"])
+    st.bar_chart(average_scores_by_topic())
 
-    avg_scores = {k: sum(v) / len(v) for k, v in scores.items()}
-    st.bar_chart(avg_scores)
+    # -------- RAG GUIDANCE (ONE BATCH FOR ALL ATTEMPTS) --------
+    # Lexical retrieval keeps UI workers free of the embedding model
+    guidance = rag_chatbot_batch("therapy guidance", results, retriever="bm25")
 
     # -------- STUDENT DETAILS --------
-    for r in results:
+    for r, rag in zip(results, guidance):
         with st.expander(f"👤 {r['student']} — {r['assessment_topic']} ({r['score']}%)"):
 
             for resp in r.get("responses", []):
@@ -286,7 +284,8 @@ def render_teacher_analytics():
                 st.write(f"**Score:** {resp.get('score')}%")
 
                 # 🧠 SYSTEM EXPLANATION
-                explanation = generate_explanation(
+                explanation = memoized_explanation(
+                    question_id=resp.get("question_id"),
                     expected_text=resp.get("word", ""),
                     spoken_text=resp.get("transcription", ""),
                     word_score=resp.get("score", 0),
@@ -300,6 +299,5 @@ def render_teacher_analytics():
                 st.markdown("---")
 
             # 🤖 RAG THERAPY GUIDANCE
-            rag = rag_chatbot("therapy guidance", r)
             st.markdown("### 🤖 Therapy Guidance")
             st.write(rag)
@@ -0,0 +1,75 @@
+from ai_app.rag.generator import GeneratorBackend, LocalStubBackend, SummaryGenerator
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+RESULT = {
+    "score": 70,
+    "word_score": 70,
+    "language": "en",
+    "responses": [
+        {"word": "apple", "spoken_text": "apple", "score": 100},
+        {"word": "think", "spoken_text": "tink", "score": 40}
+    ]
+}
+CONTEXT = ["Practice the 'th' sound with the tongue between the teeth."]
+
+
+class ExplodingBackend(GeneratorBackend):
+    """Fails mid-stream, like a dropped network connection."""
+
+    name = "exploding"
+
+    def stream(self, request, max_tokens):
+        yield "S: "
+        raise ConnectionError("connection reset")
+
+
+def main():
+    print("\n=== OFFLINE SUMMARY GENERATOR CHECKS ===\n")
+
+    # 1️⃣ Backends must implement stream()
+    try:
+        GeneratorBackend()
+        raise AssertionError("abstract backend was instantiated")
+    except TypeError:
+        pass
+
+    # 2️⃣ Stub is deterministic and cached
+    generator = SummaryGenerator(LocalStubBackend())
+    first = generator.summarize(RESULT, CONTEXT)
+    assert first == SummaryGenerator(LocalStubBackend()).summarize(RESULT, CONTEXT)
+    assert first.startswith("S:") and "think -> tink" in first
+    assert list(generator.stream_summary(RESULT, CONTEXT)) == [first]
+
+    # 3️⃣ Token budget
+    short = generator.summarize(RESULT, CONTEXT, max_tokens=5)
+    assert len(short.split()) <= 5
+
+    # 4️⃣ Busy backend times out instead of blocking the page
+    busy = SummaryGenerator(LocalStubBackend(), max_concurrent=1, slot_timeout=0.05)
+    held = busy.stream_summary(RESULT, CONTEXT)
+    next(held)
+    try:
+        busy.summarize(RESULT, CONTEXT, max_tokens=3)
+        raise AssertionError("second request did not time out")
+    except TimeoutError:
+        pass
+    held.close()  # releases the slot
+    assert busy.summarize(RESULT, CONTEXT, max_tokens=3)
+
+    # 5️⃣ Failed streams release their slot and are not cached
+    failing = SummaryGenerator(ExplodingBackend(), max_concurrent=1, slot_timeout=0.05)
+    for _ in range(2):
+        try:
+            failing.summarize(RESULT, CONTEXT)
+            raise AssertionError("backend error was swallowed")
+        except ConnectionError:
+            pass
+
+    print(first)
+    print("\nAll generator checks passed")
+
+
+if __name__ == "__main__":
+    main()
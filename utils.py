@@ -4,7 +4,6 @@ Helper functions for file operations, session state, and navigation
 """
 
 import streamlit as st
-import json
 import os
 import uuid
 from datetime import datetime
@@ -15,6 +14,11 @@ from config import (
     THEME_LIGHT,
     THEME_DARK
 )
+from ai_app.utils.storage import JsonDocument
+from ai_app.assessments.catalog import get_catalog, list_tests, refresh_catalog
+
+# Atomic, lock-protected, group-committed assessments file
+_assessments_doc = JsonDocument(ASSESSMENTS_FILE, lambda: {"assessments": []})
 
 
 # ============================================================================
@@ -102,8 +106,7 @@ def load_assessments():
         return default_data
     
     try:
-        with open(ASSESSMENTS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _assessments_doc.read()
     except Exception as e:
         print(f"Error loading assessments: {e}")
         return {"assessments": []}
@@ -111,7 +114,7 @@ def load_assessments():
 
 def save_assessments(data):
     """
-    Save assessments to JSON file
+    Save assessments to JSON file (atomic replace under the file lock)
     
     Args:
         data (dict): Dictionary containing assessments
@@ -119,12 +122,40 @@ def save_assessments(data):
     ensure_directories()
     
     try:
-        with open(ASSESSMENTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        _assessments_doc.write(data)
         return True
     except Exception as e:
         print(f"Error saving assessments: {e}")
         return False
+    finally:
+        invalidate_assessments_cache()
+
+
+def modify_assessments(fn):
+    """
+    Apply fn(data) to the stored assessments in one locked
+    read-modify-write; concurrent callers are committed together
+    
+    Args:
+        fn (callable): Mutates the assessments dict in place
+        
+    Returns:
+        Whatever fn returns, or None if the write failed
+    """
+    ensure_directories()
+    
+    try:
+        return _assessments_doc.update(fn)
+    except Exception as e:
+        print(f"Error saving assessments: {e}")
+        return None
+    finally:
+        invalidate_assessments_cache()
+
+
+def invalidate_assessments_cache():
+    """Make the catalog the pages read pick up a write immediately"""
+    refresh_catalog()
 
 
 def generate_assessment_id():
@@ -147,16 +178,26 @@ def get_assessment_by_id(assessment_id):
         assessment_id (str): Assessment ID
         
     Returns:
-        dict: Assessment object or None
+        Mapping: Read-only catalog test or None
+    """
+    return get_catalog().by_id.get(assessment_id)
+
+
+def add_assessment(assessment):
     """
-    data = load_assessments()
-    assessments = data.get("assessments", [])
+    Append a new assessment
     
-    for assessment in assessments:
-        if assessment.get('id') == assessment_id:
-            return assessment
+    Args:
+        assessment (dict): Assessment object
+        
+    Returns:
+        bool: True if saved successfully
+    """
+    def add(data):
+        data.setdefault("assessments", []).append(assessment)
+        return True
     
-    return None
+    return bool(modify_assessments(add))
 
 
 def delete_assessment(assessment_id):
@@ -169,13 +210,14 @@ def delete_assessment(assessment_id):
     Returns:
         bool: True if deleted successfully
     """
-    data = load_assessments()
-    assessments = data.get("assessments", [])
-    
-    # Filter out the assessment
-    data["assessments"] = [a for a in assessments if a.get('id') != assessment_id]
+    def delete(data):
+        # Filter out the assessment
+        data["assessments"] = [
+            a for a in data.get("assessments", []) if a.get('id') != assessment_id
+        ]
+        return True
     
-    return save_assessments(data)
+    return bool(modify_assessments(delete))
 
 
 def update_assessment(assessment_id, updated_data):
@@ -189,20 +231,19 @@ def update_assessment(assessment_id, updated_data):
     Returns:
         bool: True if updated successfully
     """
-    data = load_assessments()
-    assessments = data.get("assessments", [])
-    
-    for i, assessment in enumerate(assessments):
-        if assessment.get('id') == assessment_id:
-            assessments[i] = updated_data
-            data["assessments"] = assessments
-            return save_assessments(data)
+    def update(data):
+        assessments = data.get("assessments", [])
+        for i, assessment in enumerate(assessments):
+            if assessment.get('id') == assessment_id:
+                assessments[i] = updated_data
+                return True
+        return False
     
-    return False
+    return bool(modify_assessments(update))
 
 
 # ============================================================================
-# ASSESSMENT HELPERS
+# ASSESSMENT HELPERS (served by the unified catalog, built-in tests included)
 # ============================================================================
 
 def get_assessments_by_teacher(teacher_username):
@@ -213,12 +254,9 @@ def get_assessments_by_teacher(teacher_username):
         teacher_username (str): Teacher's username
         
     Returns:
-        list: List of assessments
+        list: List of read-only catalog tests
     """
-    data = load_assessments()
-    assessments = data.get("assessments", [])
-    
-    return [a for a in assessments if a.get('created_by') == teacher_username]
+    return list_tests(creator=teacher_username)
 
 
 def get_assessments_by_type(assessment_type):
@@ -229,12 +267,22 @@ def get_assessments_by_type(assessment_type):
         assessment_type (str): Assessment type
         
     Returns:
-        list: List of assessments
+        list: List of read-only catalog tests
+    """
+    return list_tests(type=assessment_type)
+
+
+def get_assessments_by_language(language):
     """
-    data = load_assessments()
-    assessments = data.get("assessments", [])
+    Get all assessments in a language
     
-    return [a for a in assessments if a.get('type') == assessment_type]
+    Args:
+        language (str): Language name or code (normalized by the catalog)
+        
+    Returns:
+        list: List of read-only catalog tests
+    """
+    return list_tests(language=language)
 
 
 def count_assessments_by_teacher(teacher_username):
@@ -247,7 +295,7 @@ def count_assessments_by_teacher(teacher_username):
     Returns:
         int: Number of assessments
     """
-    return len(get_assessments_by_teacher(teacher_username))
+    return len(list_tests(creator=teacher_username))
 
 
 # ============================================================================